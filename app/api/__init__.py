@@ -1,4 +1,5 @@
 from .routes_github import router as github_router
 from .routes_user import router as user_router
+from .routes_webhooks import router as webhook_router
 
-__all__ = ["github_router", "user_router"]
\ No newline at end of file
+__all__ = ["github_router", "user_router", "webhook_router"]
\ No newline at end of file
@@ -1,28 +1,48 @@
+from celery.utils import uuid
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from datetime import datetime, timedelta
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+import asyncio
+import json
+from datetime import datetime, time, timedelta, timezone
 from typing import List, Optional
 
 from ..core.database import get_db
-from ..models import User, Contribution
+from ..models import User
 from ..schemas import GitHubSyncRequest, GitHubSyncResponse, ActivitySummaryResponse, ActivitySummary
-from ..workers.tasks import sync_github_data
+from ..core.config import settings
+from ..core.redis import async_redis_client
+from ..services.activity_rollup import get_daily_activity
+from ..services.sync_lease import github_sync_lease
+from ..services.sync_progress import (
+    TERMINAL_STAGES, get_progress_snapshot, progress_channel, progress_snapshot_key
+)
+from ..workers.tasks import INTERACTIVE_PRIORITY, sync_github_data
 
 router = APIRouter(prefix="/sync", tags=["GitHub Sync"])
 
+# Comment lines sent while a stream is idle so proxies keep it open
+STREAM_KEEPALIVE_SECONDS = 15
+STREAM_MAX_SECONDS = 3600
+
 
 @router.post("/github", response_model=GitHubSyncResponse)
 async def sync_github_contributions(
     request: GitHubSyncRequest,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks
 ):
     """
     Queue a GitHub sync job for a user.
     
     - **username**: GitHub username to sync (optional, defaults to authenticated user)
     - **days_back**: Number of days to look back for contributions (default: 30)
+    
+    If a sync for the user is already queued or running, its id is returned
+    instead. When that sync is part of a scheduled batch, the id is the
+    user's own sync id within the batch, so the status and stream endpoints
+    report on this user alone.
     """
     username = request.username
     
@@ -33,13 +53,36 @@ async def sync_github_contributions(
         )
     
     try:
-        # Queue the sync task
-        task = sync_github_data.delay(username, request.days_back)
+        # Join a sync that is already queued or running for this user,
+        # widening it if this request asks for more history. The lease and
+        # the broker use blocking Redis clients, so they run in the threadpool
+        task_id, created = await run_in_threadpool(
+            github_sync_lease.acquire, username, request.days_back, uuid()
+        )
+        if not created:
+            return GitHubSyncResponse(
+                success=True,
+                message=f"GitHub sync already in progress for user: {username}",
+                task_id=task_id
+            )
+        
+        # Queue the sync task ahead of any scheduled fan-out
+        try:
+            await run_in_threadpool(
+                sync_github_data.apply_async,
+                args=(username, request.days_back),
+                task_id=task_id,
+                queue=settings.CELERY_INTERACTIVE_QUEUE,
+                priority=INTERACTIVE_PRIORITY,
+            )
+        except Exception:
+            await run_in_threadpool(github_sync_lease.abandon, username, task_id)
+            raise
         
         return GitHubSyncResponse(
             success=True,
             message=f"GitHub sync queued for user: {username}",
-            task_id=task.id
+            task_id=task_id
         )
         
     except Exception as e:
@@ -50,16 +93,37 @@ async def sync_github_contributions(
 
 
 @router.get("/github/status/{task_id}")
-async def get_sync_status(task_id: str):
-    """Get the status of a GitHub sync task."""
+def get_sync_status(task_id: str):
+    """
+    Get the status of a GitHub sync task.
+    
+    Also accepts the per-user sync ids of batched syncs, which are not
+    Celery tasks; their status comes from the published progress alone.
+    """
+    # A plain def: the result backend and snapshot reads are blocking Redis
+    # calls, so FastAPI runs this in its threadpool
     from ..workers.tasks import celery_app
     
     task = celery_app.AsyncResult(task_id)
     
     if task.state == "PENDING":
-        return {"status": "pending", "message": "Task is waiting to be processed"}
+        progress = get_progress_snapshot(task_id)
+        if progress is None:
+            return {"status": "pending", "message": "Task is waiting to be processed"}
+        if progress["stage"] in TERMINAL_STAGES:
+            status = "failed" if progress["stage"] == "failed" else "completed"
+            return {"status": status, "message": f"Sync {progress['stage']}", "progress": progress}
+        return {
+            "status": "in_progress",
+            "message": "Sync is being processed",
+            "progress": progress
+        }
     elif task.state == "PROGRESS":
-        return {"status": "in_progress", "message": "Task is being processed"}
+        return {
+            "status": "in_progress",
+            "message": "Task is being processed",
+            "progress": get_progress_snapshot(task_id)
+        }
     elif task.state == "SUCCESS":
         return {
             "status": "completed",
@@ -76,11 +140,54 @@ async def get_sync_status(task_id: str):
         return {"status": task.state, "message": f"Task state: {task.state}"}
 
 
+@router.get("/github/stream/{task_id}")
+async def stream_sync_progress(task_id: str):
+    """
+    Stream a GitHub sync task's progress as Server-Sent Events.
+    
+    Each ``progress`` event carries repos done/total, commits fetched,
+    contributions stored, API calls used and rate-limit remaining. The
+    stream ends once the task completes, fails or is skipped.
+    """
+    async def events():
+        pubsub = async_redis_client.pubsub()
+        # Subscribe before reading the snapshot so no update is missed
+        await pubsub.subscribe(progress_channel(task_id))
+        try:
+            snapshot = await async_redis_client.get(progress_snapshot_key(task_id))
+            if snapshot:
+                yield f"event: progress\ndata: {snapshot}\n\n"
+                if json.loads(snapshot)["stage"] in TERMINAL_STAGES:
+                    return
+            
+            deadline = asyncio.get_running_loop().time() + STREAM_MAX_SECONDS
+            while asyncio.get_running_loop().time() < deadline:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=STREAM_KEEPALIVE_SECONDS
+                )
+                if message is None:
+                    yield ": keepalive\n\n"
+                    continue
+                
+                yield f"event: progress\ndata: {message['data']}\n\n"
+                if json.loads(message["data"])["stage"] in TERMINAL_STAGES:
+                    return
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/activity/summary/{username}", response_model=ActivitySummaryResponse)
 async def get_activity_summary(
     username: str,
     days_back: int = 30,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get a summary of user activity over the specified time period.
@@ -89,54 +196,30 @@ async def get_activity_summary(
     - **days_back**: Number of days to include in summary (default: 30)
     """
     # Find user
-    user = db.query(User).filter(User.github_username == username).first()
-    if not user:
+    user_id = await db.scalar(select(User.id).where(User.github_username == username))
+    if not user_id:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Calculate date range
-    end_date = datetime.utcnow()
-    start_date = end_date - timedelta(days=days_back)
+    # The window is days_back whole UTC days ending today, read from the
+    # daily rollup: at most one row per day, however many commits they hold
+    end_date = datetime.now(timezone.utc)
+    end_day = end_date.date()
+    start_day = end_day - timedelta(days=max(days_back, 1) - 1)
+    start_date = datetime.combine(start_day, time.min, tzinfo=timezone.utc)
     
-    # Get contributions in the date range
-    contributions = db.query(Contribution).filter(
-        Contribution.user_id == user.id,
-        Contribution.commit_date >= start_date,
-        Contribution.commit_date <= end_date
-    ).all()
+    days = await db.run_sync(get_daily_activity, user_id, start_day, end_day)
     
-    # Group by date
-    daily_activity = {}
-    total_commits = 0
-    
-    for contrib in contributions:
-        date_str = contrib.commit_date.strftime("%Y-%m-%d")
-        
-        if date_str not in daily_activity:
-            daily_activity[date_str] = {
-                "date": date_str,
-                "commit_count": 0,
-                "total_additions": 0,
-                "total_deletions": 0,
-                "repos_touched": set()
-            }
-        
-        daily_activity[date_str]["commit_count"] += 1
-        daily_activity[date_str]["total_additions"] += contrib.additions
-        daily_activity[date_str]["total_deletions"] += contrib.deletions
-        daily_activity[date_str]["repos_touched"].add(contrib.repo_name)
-        total_commits += 1
-    
-    # Convert to response format
-    daily_summary = []
-    for date_str in sorted(daily_activity.keys()):
-        activity = daily_activity[date_str]
-        daily_summary.append(ActivitySummary(
-            date=activity["date"],
-            commit_count=activity["commit_count"],
-            total_additions=activity["total_additions"],
-            total_deletions=activity["total_deletions"],
-            repos_touched=len(activity["repos_touched"])
-        ))
+    daily_summary = [
+        ActivitySummary(
+            date=day.date.isoformat(),
+            commit_count=day.commit_count,
+            total_additions=day.additions,
+            total_deletions=day.deletions,
+            repos_touched=day.repos_touched
+        )
+        for day in days
+    ]
+    total_commits = sum(day.commit_count for day in days)
     
     return ActivitySummaryResponse(
         username=username,
@@ -1,22 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, select, tuple_
+import base64
+import binascii
+from datetime import datetime
+from typing import List, Optional, Tuple
 
 from ..core.database import get_db
-from ..models import User, Contribution
-from ..schemas import UserCreate, UserUpdate, UserResponse, UserSummary
+from ..models import User, Contribution, UserStats
+from ..schemas import (
+    ContributionPage, ContributionResponse, UserCreate, UserUpdate, UserProfile, UserSummary
+)
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
+MAX_CONTRIBUTIONS_PAGE = 100
 
-@router.post("/", response_model=UserResponse)
-async def create_user(user: UserCreate, db: Session = Depends(get_db)):
+
+async def _load_user(db: AsyncSession, *criteria) -> Optional[User]:
+    """Fetch one user, re-reading columns the database may have set."""
+    result = await db.execute(
+        select(User).where(*criteria).execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+
+def _encode_cursor(contribution: Contribution) -> str:
+    """An opaque cursor pointing just past ``contribution`` in newest-first order."""
+    position = f"{contribution.commit_date.isoformat()}|{contribution.id}"
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        commit_date, contribution_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        )
+        return datetime.fromisoformat(commit_date), int(contribution_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.post("/", response_model=UserProfile)
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """Create a new user."""
     # Check if user already exists
-    existing_user = db.query(User).filter(
-        User.github_username == user.github_username
-    ).first()
+    existing_user = await db.scalar(
+        select(User.id).where(User.github_username == user.github_username)
+    )
     
     if existing_user:
         raise HTTPException(
@@ -26,26 +57,41 @@ async def create_user(user: UserCreate, db: Session = Depends(get_db)):
     
     db_user = User(**user.dict())
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
     
-    return db_user
+    return await _load_user(db, User.id == db_user.id)
 
 
 @router.get("/", response_model=List[UserSummary])
 async def list_users(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db)
+    after_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db)
 ):
-    """List all users with contribution counts."""
-    users = db.query(
+    """
+    List all users with contribution counts, ordered by id.
+    
+    - **after_id**: Keyset paging; pass the last id of the previous page
+      instead of a growing ``skip`` to start right after it
+    """
+    # Counters come from user_stats, one row per user joined on its key, so
+    # a page reads only its own users however many contributions exist
+    query = select(
         User.id,
         User.github_username,
         User.full_name,
         User.avatar_url,
-        func.count(Contribution.id).label("total_contributions")
-    ).outerjoin(Contribution).group_by(User.id).offset(skip).limit(limit).all()
+        UserStats.total_contributions,
+        UserStats.total_additions,
+        UserStats.total_deletions,
+        UserStats.last_commit_date
+    ).outerjoin(UserStats, UserStats.user_id == User.id)
+    if after_id is not None:
+        query = query.where(User.id > after_id)
+    
+    result = await db.execute(query.order_by(User.id).offset(skip).limit(limit))
+    users = result.all()
     
     return [
         UserSummary(
@@ -53,38 +99,93 @@ async def list_users(
             github_username=user.github_username,
             full_name=user.full_name,
             avatar_url=user.avatar_url,
-            total_contributions=user.total_contributions or 0
+            total_contributions=user.total_contributions or 0,
+            total_additions=user.total_additions or 0,
+            total_deletions=user.total_deletions or 0,
+            last_commit_date=user.last_commit_date
         )
         for user in users
     ]
 
 
-@router.get("/{user_id}", response_model=UserResponse)
-async def get_user(user_id: int, db: Session = Depends(get_db)):
+@router.get("/{user_id}", response_model=UserProfile)
+async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific user by ID."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await _load_user(db, User.id == user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 
-@router.get("/username/{username}", response_model=UserResponse)
-async def get_user_by_username(username: str, db: Session = Depends(get_db)):
+@router.get("/username/{username}", response_model=UserProfile)
+async def get_user_by_username(username: str, db: AsyncSession = Depends(get_db)):
     """Get a specific user by GitHub username."""
-    user = db.query(User).filter(User.github_username == username).first()
+    user = await _load_user(db, User.github_username == username)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 
-@router.put("/{user_id}", response_model=UserResponse)
+@router.get("/{user_id}/contributions", response_model=ContributionPage)
+async def list_user_contributions(
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=MAX_CONTRIBUTIONS_PAGE),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    repo: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    List a user's contributions, newest first, one page at a time.
+    
+    - **cursor**: ``next_cursor`` of the previous page; omit for the first page
+    - **limit**: Page size (default: 50, at most 100)
+    - **since** / **until**: Only commits made in this range (inclusive)
+    - **repo**: Only commits to this repository (``owner/name``)
+    """
+    if not await db.scalar(select(User.id).where(User.id == user_id)):
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    query = select(Contribution).where(Contribution.user_id == user_id)
+    if since:
+        query = query.where(Contribution.commit_date >= since)
+    if until:
+        query = query.where(Contribution.commit_date <= until)
+    if repo:
+        query = query.where(Contribution.repo_name == repo)
+    if cursor:
+        # Keyset paging: continue strictly after the last row served, so a
+        # page costs the same however deep into the history it is
+        query = query.where(
+            tuple_(Contribution.commit_date, Contribution.id) < _decode_cursor(cursor)
+        )
+    
+    # One extra row tells whether another page follows
+    result = await db.scalars(
+        query.order_by(Contribution.commit_date.desc(), Contribution.id.desc()).limit(limit + 1)
+    )
+    contributions = result.all()
+    
+    next_cursor = None
+    if len(contributions) > limit:
+        contributions = contributions[:limit]
+        next_cursor = _encode_cursor(contributions[-1])
+    
+    return ContributionPage(
+        contributions=[ContributionResponse.model_validate(c) for c in contributions],
+        next_cursor=next_cursor
+    )
+
+
+@router.put("/{user_id}", response_model=UserProfile)
 async def update_user(
     user_id: int, 
     user_update: UserUpdate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a user."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await _load_user(db, User.id == user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -92,23 +193,24 @@ async def update_user(
     for key, value in update_data.items():
         setattr(user, key, value)
     
-    db.commit()
-    db.refresh(user)
-    return user
+    await db.commit()
+    
+    # Reload the server-set updated_at along with the rest of the row
+    return await _load_user(db, User.id == user_id)
 
 
 @router.delete("/{user_id}")
-async def delete_user(user_id: int, db: Session = Depends(get_db)):
+async def delete_user(user_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a user and all their contributions."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     # Delete associated contributions first
-    db.query(Contribution).filter(Contribution.user_id == user_id).delete()
+    await db.execute(delete(Contribution).where(Contribution.user_id == user_id))
     
     # Delete user
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
     
     return {"message": "User deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,81 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from ..core.config import settings
+from ..core.database import get_db
+from ..models import User
+from ..services.contribution_store import insert_contributions
+from ..services.github_webhooks import (
+    FORM_CONTENT_TYPE, JSON_CONTENT_TYPE, is_default_branch_push, parse_payload,
+    push_author_logins, push_to_rows, verify_signature
+)
+from ..workers.tasks import enrich_contributions
+
+router = APIRouter(prefix="/webhooks", tags=["Webhooks"])
+
+
+@router.post("/github", status_code=202)
+async def receive_github_webhook(
+    request: Request,
+    x_github_event: str = Header(...),
+    x_hub_signature_256: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Receive GitHub webhook deliveries.
+    
+    Push events to a repo's default branch are stored right away for the
+    tracked users who authored the commits; line stats are filled in later
+    by a background task, so the delivery is acknowledged immediately.
+    Both webhook content types, JSON and form-encoded, are accepted.
+    """
+    if not settings.GITHUB_WEBHOOK_SECRET:
+        raise HTTPException(status_code=503, detail="GitHub webhooks are not configured")
+    
+    body = await request.body()
+    if not verify_signature(settings.GITHUB_WEBHOOK_SECRET, body, x_hub_signature_256):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    
+    if x_github_event == "ping":
+        return {"status": "ok"}
+    if x_github_event != "push":
+        return {"status": "ignored", "event": x_github_event}
+    
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in (JSON_CONTENT_TYPE, FORM_CONTENT_TYPE):
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported webhook content type: {content_type or 'none'}"
+        )
+    try:
+        payload = parse_payload(body, content_type)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Malformed webhook payload")
+    
+    if not is_default_branch_push(payload):
+        return {"status": "ignored", "event": x_github_event}
+    
+    logins = push_author_logins(payload)
+    users = (await db.execute(
+        select(User.id, User.github_username).where(
+            User.github_username.in_(logins),
+            User.is_active == True
+        )
+    )).all() if logins else []
+    
+    rows = push_to_rows(payload, {user.github_username: user.id for user in users})
+    inserted = await db.run_sync(insert_contributions, rows)
+    await db.commit()
+    
+    if inserted:
+        # Publishing to the broker blocks on Redis
+        await run_in_threadpool(
+            enrich_contributions.delay,
+            payload["repository"]["full_name"], [row["commit_sha"] for row in rows]
+        )
+    
+    return {"status": "accepted", "contributions_inserted": inserted}
@@ -10,6 +10,87 @@ class Settings(BaseSettings):
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
     CORS_ORIGINS: list[str] = ["*"]
+
+    # Database connection pools, sized per process role: "api", "worker"
+    # or "beat". Every user sync has a session of its own and a bulk task
+    # syncs a whole batch at once, so size a worker's pool to its
+    # concurrency times GITHUB_SCHEDULE_BATCH_SIZE (4 x 25 here)
+    DB_POOL_ROLE: str = "api"
+    DB_API_POOL_SIZE: int = 20
+    DB_API_MAX_OVERFLOW: int = 10
+    DB_API_POOL_TIMEOUT: float = 10
+    DB_WORKER_POOL_SIZE: int = 100
+    DB_WORKER_MAX_OVERFLOW: int = 4
+    DB_WORKER_POOL_TIMEOUT: float = 30
+    DB_BEAT_POOL_SIZE: int = 1
+    DB_BEAT_MAX_OVERFLOW: int = 1
+    DB_BEAT_POOL_TIMEOUT: float = 30
+    # Behind PgBouncer in transaction mode: the bouncer does the pooling and
+    # asyncpg must not cache prepared statements across transactions
+    DB_PGBOUNCER: bool = False
+    
+    # Shared secret for verifying GitHub webhook deliveries; empty disables them
+    GITHUB_WEBHOOK_SECRET: str = ""
+    
+    # GitHub HTTP client
+    GITHUB_API_URL: str = "https://api.github.com"
+    GITHUB_HTTP2: bool = True
+    GITHUB_MAX_CONNECTIONS: int = 20
+    GITHUB_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    GITHUB_KEEPALIVE_EXPIRY: float = 30.0
+    GITHUB_TIMEOUT: float = 30.0
+    GITHUB_CONNECT_TIMEOUT: float = 10.0
+    GITHUB_SYNC_CONCURRENCY: int = 10
+    # "graphql" fetches commit stats in bulk; "rest" uses one call per commit
+    GITHUB_SYNC_MODE: str = "graphql"
+    GITHUB_GRAPHQL_REPOS_PER_QUERY: int = 5
+    # Re-scan this far behind a repo's newest known commit on incremental syncs
+    GITHUB_WATERMARK_OVERLAP_DAYS: int = 3
+    
+    # Conditional-request (ETag) cache for GitHub list endpoints
+    GITHUB_ETAG_CACHE_TTL: int = 7 * 24 * 3600
+    GITHUB_ETAG_CACHE_MAX_ENTRIES: int = 50000
+    GITHUB_ETAG_CACHE_MAX_ENTRY_BYTES: int = 1_000_000
+    
+    # Events-API fast path for frequent syncs
+    GITHUB_EVENTS_POLL_INTERVAL: int = 60
+    GITHUB_EVENTS_LOOKBACK_HOURS: int = 6
+    
+    # On-disk cache of immutable commit details; an empty path disables it
+    GITHUB_COMMIT_CACHE_PATH: str = ".cache/commit_details.sqlite3"
+    GITHUB_COMMIT_CACHE_MAX_ENTRIES: int = 200000
+    
+    # Cluster-wide GitHub rate-limit governor
+    GITHUB_RATE_LIMIT_BURST: int = 500
+    GITHUB_RATE_LIMIT_RESERVE: int = 100
+    GITHUB_RATE_LIMIT_MAX_RETRIES: int = 3
+    
+    # A queued or running user sync coalesces later requests for this long
+    GITHUB_SYNC_LEASE_TTL: int = 3600
+    # How long a task's latest progress snapshot is kept for late subscribers
+    GITHUB_SYNC_PROGRESS_TTL: int = 3600
+    # Per-repo resume cursors of interrupted syncs are kept this long
+    GITHUB_SYNC_CHECKPOINT_TTL: int = 24 * 3600
+    
+    # Adaptive scheduling: users are synced about every COMMITS_PER_SYNC
+    # commits, judged by their rate over ACTIVITY_DAYS, within the bounds
+    GITHUB_SCHEDULE_TICK_SECONDS: int = 300
+    GITHUB_SCHEDULE_ACTIVITY_DAYS: int = 14
+    GITHUB_SCHEDULE_COMMITS_PER_SYNC: float = 5.0
+    GITHUB_SCHEDULE_MIN_INTERVAL: int = 3600
+    GITHUB_SCHEDULE_MAX_INTERVAL: int = 7 * 24 * 3600
+    GITHUB_SCHEDULE_JITTER: float = 0.1
+    GITHUB_SCHEDULE_MAX_DISPATCH: int = 1000
+    # Dispatched batches start at stable per-user slots within the tick
+    GITHUB_SCHEDULE_SLOT_SECONDS: int = 60
+    GITHUB_SCHEDULE_BATCH_SIZE: int = 25
+    GITHUB_SCHEDULE_QUERY_CHUNK: int = 1000
+    # Dispatched users are not dispatched again for this long unless synced
+    GITHUB_SCHEDULE_CLAIM_SECONDS: int = 3600
+    
+    # Celery queues: user-triggered work never waits behind scheduled fan-out
+    CELERY_INTERACTIVE_QUEUE: str = "interactive"
+    CELERY_BULK_QUEUE: str = "bulk"
     
     class Config:
         env_file = ".env"
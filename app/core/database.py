@@ -1,26 +1,167 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Any, Dict, Type
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
 from .config import settings
 
+POOL_ROLES = ("api", "worker", "beat")
+
+
+class PoolStats:
+    """Checkouts of one engine's pool and how long they waited for a connection."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+    
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 3),
+                "wait_seconds_avg": round(
+                    self.wait_seconds_total / max(self.checkouts + self.timeouts, 1), 6
+                ),
+                "wait_seconds_max": round(self.wait_seconds_max, 3),
+            }
+
+
+def timed_pool_class(base: Type[QueuePool], stats: PoolStats) -> Type[QueuePool]:
+    """
+    A pool class that records into ``stats`` how long each checkout took.
+    
+    The wait covers queueing for a free connection and opening an overflow
+    one. Pools recreated by dispose() keep the class, and so the stats.
+    """
+    class TimedPool(base):
+        def _do_get(self):
+            started = time.monotonic()
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                stats.record(time.monotonic() - started, timed_out=True)
+                raise
+            stats.record(time.monotonic() - started)
+            return connection
+    
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+def pool_options(role: str, pool_class: Type[QueuePool], stats: PoolStats) -> Dict[str, Any]:
+    """Engine pool arguments for a process role."""
+    if role not in POOL_ROLES:
+        raise ValueError(f"Unknown DB_POOL_ROLE {role!r}; expected one of {', '.join(POOL_ROLES)}")
+    
+    if settings.DB_PGBOUNCER:
+        # PgBouncer owns the server connections; holding idle ones here too
+        # would only pin bouncer slots
+        return {"poolclass": NullPool}
+    
+    prefix = f"DB_{role.upper()}_"
+    return {
+        "poolclass": timed_pool_class(pool_class, stats),
+        "pool_size": getattr(settings, prefix + "POOL_SIZE"),
+        "max_overflow": getattr(settings, prefix + "MAX_OVERFLOW"),
+        "pool_timeout": getattr(settings, prefix + "POOL_TIMEOUT"),
+        "pool_pre_ping": True,
+        "pool_recycle": 3600,
+    }
+
+
+sync_pool_stats = PoolStats()
+async_pool_stats = PoolStats()
+
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=3600,
+    **pool_options(settings.DB_POOL_ROLE, QueuePool, sync_pool_stats),
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def async_database_url(url: str) -> str:
+    """The same database reached through the asyncpg driver."""
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+# The API queries through asyncpg so a request waiting on the database does
+# not block the event loop; Celery tasks and scripts keep the sync engine
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    # Transaction pooling hands each transaction a different server
+    # connection, so statements prepared on one are missing on the next
+    connect_args=(
+        {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+        if settings.DB_PGBOUNCER else {}
+    ),
+    **pool_options(settings.DB_POOL_ROLE, AsyncAdaptedQueuePool, async_pool_stats),
+)
+
+# Objects stay usable after commit; an expired attribute cannot lazy-load
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+def dispose_inherited_pools():
+    """
+    Drop connections inherited from a parent process without closing them.
+    
+    Call in a freshly forked child: the sockets still belong to the parent,
+    so the child must open its own instead of sharing them.
+    """
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+
+
+def _pool_status(pool: Pool, stats: PoolStats) -> Dict[str, Any]:
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        # QueuePool counts overflow from -pool_size until the pool is full
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+        **stats.snapshot(),
+    }
+
+
+def pool_status() -> Dict[str, Any]:
+    """Current pool occupancy and cumulative checkout waits of both engines."""
+    return {
+        "role": settings.DB_POOL_ROLE,
+        "pgbouncer": settings.DB_PGBOUNCER,
+        "sync": _pool_status(engine.pool, sync_pool_stats),
+        "async": _pool_status(async_engine.pool, async_pool_stats),
+    }
 
 
 def create_tables():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
@@ -1,4 +1,8 @@
 import redis
+import redis.asyncio
 from .config import settings
 
-redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
\ No newline at end of file
+redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+# For async code that blocks on Redis, such as pub/sub subscribers
+async_redis_client = redis.asyncio.from_url(settings.REDIS_URL, decode_responses=True)
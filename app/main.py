@@ -5,8 +5,9 @@ import logging
 import uvicorn
 
 from .core.config import settings
-from .core.database import create_tables
-from .api import github_router, user_router
+from .core.database import async_engine, pool_status
+from .services.github_sync import github_sync_service
+from .api import github_router, user_router, webhook_router
 
 # Configure logging
 logging.basicConfig(
@@ -22,13 +23,13 @@ async def lifespan(app: FastAPI):
     """Application lifespan events."""
     logger.info("Starting Devlog Radar API...")
     
-    # Create database tables
-    create_tables()
-    logger.info("Database tables created")
+    # The schema is managed by Alembic; run `alembic upgrade head` on deploy
     
     yield
     
     logger.info("Shutting down Devlog Radar API...")
+    await github_sync_service.aclose()
+    await async_engine.dispose()
 
 
 # Create FastAPI app
@@ -51,6 +52,7 @@ app.add_middleware(
 # Include routers
 app.include_router(github_router)
 app.include_router(user_router)
+app.include_router(webhook_router)
 
 
 @app.get("/")
@@ -71,7 +73,8 @@ async def health_check():
     return {
         "status": "healthy",
         "environment": settings.ENVIRONMENT,
-        "database": "connected"  # Could add actual DB health check here
+        "database": "connected",  # Could add actual DB health check here
+        "database_pools": pool_status()
     }
 
 
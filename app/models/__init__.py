@@ -1,4 +1,10 @@
 from .user import User
 from .contribution import Contribution
+from .sync_state import UserSyncState, RepoSyncState
+from .daily_activity import DailyActivity, DailyActivityRepo
+from .user_stats import UserStats
 
-__all__ = ["User", "Contribution"]
\ No newline at end of file
+__all__ = [
+    "User", "Contribution", "UserSyncState", "RepoSyncState",
+    "DailyActivity", "DailyActivityRepo", "UserStats"
+]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..core.database import Base
@@ -6,6 +6,15 @@ from ..core.database import Base
 
 class Contribution(Base):
     __tablename__ = "contributions"
+    __table_args__ = (
+        # Per-user date-range scans; INCLUDE lets summaries skip the heap
+        Index(
+            "ix_contributions_user_id_commit_date",
+            "user_id",
+            "commit_date",
+            postgresql_include=["additions", "deletions", "repo_name"],
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
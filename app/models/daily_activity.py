@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from ..core.database import Base
+
+
+# Per-user, per-day (UTC) contribution totals, maintained at ingest time
+class DailyActivity(Base):
+    __tablename__ = "daily_activity"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    commit_count = Column(Integer, nullable=False, default=0)
+    additions = Column(Integer, nullable=False, default=0)
+    deletions = Column(Integer, nullable=False, default=0)
+    repos_touched = Column(Integer, nullable=False, default=0)
+
+
+# The repos behind each DailyActivity row, so repos_touched stays incremental
+class DailyActivityRepo(Base):
+    __tablename__ = "daily_activity_repos"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    repo_name = Column(String, primary_key=True)
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class UserSyncState(Base):
+    __tablename__ = "user_sync_states"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    last_synced_at = Column(DateTime(timezone=True))
+    # When the adaptive scheduler should sync the user next; NULL means now
+    next_sync_at = Column(DateTime(timezone=True), index=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class RepoSyncState(Base):
+    __tablename__ = "repo_sync_states"
+    __table_args__ = (
+        UniqueConstraint("user_id", "repo_name", name="uq_repo_sync_states_user_repo"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    repo_name = Column(String, nullable=False)
+    # Repo pushed_at as of the last successful sync
+    pushed_at = Column(DateTime(timezone=True))
+    # Newest commit date seen for this user in the repo
+    last_commit_date = Column(DateTime(timezone=True))
+    # Start of the window that has been fully synced up to last_synced_at
+    covered_since = Column(DateTime(timezone=True), nullable=False)
+    last_synced_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, BigInteger, DateTime, ForeignKey
+from ..core.database import Base
+
+
+# Per-user contribution counters, maintained at ingest time alongside the
+# daily rollup so listing users never aggregates contributions
+class UserStats(Base):
+    __tablename__ = "user_stats"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total_contributions = Column(Integer, nullable=False, default=0)
+    total_additions = Column(BigInteger, nullable=False, default=0)
+    total_deletions = Column(BigInteger, nullable=False, default=0)
+    last_commit_date = Column(DateTime(timezone=True))
@@ -1,9 +1,10 @@
-from .user import UserCreate, UserUpdate, UserResponse, UserSummary
+from .user import UserCreate, UserUpdate, UserProfile, UserResponse, UserSummary
 from .github import (
     GitHubSyncRequest, 
     GitHubSyncResponse, 
     ContributionCreate, 
     ContributionResponse,
+    ContributionPage,
     ActivitySummary,
     ActivitySummaryResponse
 )
@@ -11,12 +12,14 @@ from .github import (
 __all__ = [
     "UserCreate", 
     "UserUpdate", 
+    "UserProfile",
     "UserResponse", 
     "UserSummary",
     "GitHubSyncRequest",
     "GitHubSyncResponse",
     "ContributionCreate",
     "ContributionResponse", 
+    "ContributionPage",
     "ActivitySummary",
     "ActivitySummaryResponse"
 ]
\ No newline at end of file
@@ -40,6 +40,12 @@ class ContributionResponse(ContributionBase):
         from_attributes = True
 
 
+class ContributionPage(BaseModel):
+    contributions: List[ContributionResponse]
+    # Pass back as ``cursor`` for the next page; None on the last page
+    next_cursor: Optional[str] = None
+
+
 class ActivitySummary(BaseModel):
     date: str
     commit_count: int
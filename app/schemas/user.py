@@ -22,24 +22,30 @@ class UserUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 
-class UserResponse(UserBase):
+class UserProfile(UserBase):
     id: int
     github_id: Optional[int]
     is_active: bool
     created_at: datetime
     updated_at: Optional[datetime]
-    contributions: List[ContributionResponse] = []
     
     class Config:
         from_attributes = True
 
 
+class UserResponse(UserProfile):
+    contributions: List[ContributionResponse] = []
+
+
 class UserSummary(BaseModel):
     id: int
     github_username: str
     full_name: Optional[str]
     avatar_url: Optional[str]
     total_contributions: int
+    total_additions: int = 0
+    total_deletions: int = 0
+    last_commit_date: Optional[datetime] = None
     
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -0,0 +1,242 @@
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import Date, Row, cast, distinct, func, literal_column, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Query, Session
+from ..models import Contribution, DailyActivity, DailyActivityRepo, UserStats
+
+DayKey = Tuple[int, date]
+
+
+def utc_day(value: datetime) -> date:
+    """The UTC calendar day of a timestamp; naive timestamps are taken as UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def _empty_user_totals() -> Dict[str, Any]:
+    return {
+        "total_contributions": 0,
+        "total_additions": 0,
+        "total_deletions": 0,
+        "last_commit_date": None,
+    }
+
+
+def record_new_contributions(db: Session, rows: Iterable[Any]):
+    """
+    Fold freshly inserted contributions into the daily rollup and user stats.
+    
+    ``rows`` carry user_id, commit_date, additions, deletions and repo_name of
+    rows that were actually inserted. Runs in the caller's transaction, so
+    the rollups commit or roll back together with the contributions.
+    """
+    totals: Dict[DayKey, Dict[str, int]] = defaultdict(
+        lambda: {"commit_count": 0, "additions": 0, "deletions": 0}
+    )
+    user_totals: Dict[int, Dict[str, Any]] = defaultdict(_empty_user_totals)
+    repos = set()
+    for row in rows:
+        key = (row.user_id, utc_day(row.commit_date))
+        totals[key]["commit_count"] += 1
+        totals[key]["additions"] += row.additions or 0
+        totals[key]["deletions"] += row.deletions or 0
+        repos.add(key + (row.repo_name,))
+        
+        user = user_totals[row.user_id]
+        user["total_contributions"] += 1
+        user["total_additions"] += row.additions or 0
+        user["total_deletions"] += row.deletions or 0
+        if user["last_commit_date"] is None or row.commit_date > user["last_commit_date"]:
+            user["last_commit_date"] = row.commit_date
+    if not totals:
+        return
+    
+    # Only repos not yet seen on that day add to repos_touched
+    new_repos = db.execute(
+        insert(DailyActivityRepo)
+        .values([
+            {"user_id": user_id, "date": day, "repo_name": repo_name}
+            for user_id, day, repo_name in sorted(repos)
+        ])
+        .on_conflict_do_nothing()
+        .returning(DailyActivityRepo.user_id, DailyActivityRepo.date)
+    ).all()
+    repos_touched: Dict[DayKey, int] = defaultdict(int)
+    for row in new_repos:
+        repos_touched[(row.user_id, row.date)] += 1
+    
+    _upsert_days(db, {
+        key: dict(day_totals, repos_touched=repos_touched[key])
+        for key, day_totals in totals.items()
+    })
+    _upsert_user_stats(db, user_totals)
+
+
+def record_stat_changes(db: Session, changes: Iterable[Tuple[int, datetime, int, int]]):
+    """
+    Apply changed line stats of existing contributions to the daily rollup
+    and user stats.
+    
+    ``changes`` are (user_id, commit_date, additions delta, deletions delta).
+    """
+    totals: Dict[DayKey, Dict[str, int]] = defaultdict(
+        lambda: {"commit_count": 0, "additions": 0, "deletions": 0, "repos_touched": 0}
+    )
+    user_totals: Dict[int, Dict[str, Any]] = defaultdict(_empty_user_totals)
+    for user_id, commit_date, additions, deletions in changes:
+        key = (user_id, utc_day(commit_date))
+        totals[key]["additions"] += additions
+        totals[key]["deletions"] += deletions
+        user_totals[user_id]["total_additions"] += additions
+        user_totals[user_id]["total_deletions"] += deletions
+    if totals:
+        _upsert_days(db, totals)
+        _upsert_user_stats(db, user_totals)
+
+
+def _upsert_days(db: Session, totals: Dict[DayKey, Dict[str, int]]):
+    """Add per-day deltas to daily_activity, creating missing days."""
+    stmt = insert(DailyActivity).values([
+        {"user_id": user_id, "date": day, **day_totals}
+        # A stable row order keeps concurrent writers from deadlocking
+        for (user_id, day), day_totals in sorted(totals.items())
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyActivity.user_id, DailyActivity.date],
+        set_={
+            column: getattr(DailyActivity, column) + getattr(stmt.excluded, column)
+            for column in ("commit_count", "additions", "deletions", "repos_touched")
+        },
+    )
+    db.execute(stmt)
+
+
+def _upsert_user_stats(db: Session, totals: Dict[int, Dict[str, Any]]):
+    """Add per-user deltas to user_stats, creating missing rows."""
+    stmt = insert(UserStats).values([
+        {"user_id": user_id, **user_totals}
+        # Same lock order as _upsert_days: ascending keys
+        for user_id, user_totals in sorted(totals.items())
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserStats.user_id],
+        set_={
+            **{
+                column: getattr(UserStats, column) + getattr(stmt.excluded, column)
+                for column in ("total_contributions", "total_additions", "total_deletions")
+            },
+            # GREATEST skips NULLs, so stat-only changes keep the date
+            "last_commit_date": func.greatest(
+                UserStats.last_commit_date, stmt.excluded.last_commit_date
+            ),
+        },
+    )
+    db.execute(stmt)
+
+
+def daily_activity_query(db: Session, user_id: int, start_day: date, end_day: date) -> Query:
+    """
+    Query the user's active days in a range, oldest first.
+    
+    Selects plain columns rather than ORM objects and leaves out days whose
+    commits were all removed, so the result is at most one small row per day.
+    """
+    return db.query(
+        DailyActivity.date,
+        DailyActivity.commit_count,
+        DailyActivity.additions,
+        DailyActivity.deletions,
+        DailyActivity.repos_touched
+    ).filter(
+        DailyActivity.user_id == user_id,
+        DailyActivity.date >= start_day,
+        DailyActivity.date <= end_day,
+        DailyActivity.commit_count > 0
+    ).order_by(DailyActivity.date)
+
+
+def get_daily_activity(db: Session, user_id: int, start_day: date, end_day: date) -> List[Row]:
+    """Return the user's active days in a range, oldest first."""
+    return daily_activity_query(db, user_id, start_day, end_day).all()
+
+
+def rebuild_daily_activity(db: Session, user_id: Optional[int] = None):
+    """
+    Recompute the rollup from contributions, for one user or everyone.
+    
+    Writes to contributions are blocked until the caller commits, so no
+    insert can slip in between the recount and the swap.
+    """
+    db.execute(text("LOCK TABLE contributions IN SHARE MODE"))
+    
+    day = cast(func.timezone(literal_column("'UTC'"), Contribution.commit_date), Date)
+    scope = [] if user_id is None else [Contribution.user_id == user_id]
+    
+    for model in (DailyActivityRepo, DailyActivity):
+        query = db.query(model)
+        if user_id is not None:
+            query = query.filter(model.user_id == user_id)
+        query.delete(synchronize_session=False)
+    
+    db.execute(
+        insert(DailyActivityRepo).from_select(
+            ["user_id", "date", "repo_name"],
+            select(Contribution.user_id, day, Contribution.repo_name)
+            .where(*scope)
+            .distinct()
+        )
+    )
+    db.execute(
+        insert(DailyActivity).from_select(
+            ["user_id", "date", "commit_count", "additions", "deletions", "repos_touched"],
+            select(
+                Contribution.user_id,
+                day,
+                func.count(),
+                func.coalesce(func.sum(Contribution.additions), 0),
+                func.coalesce(func.sum(Contribution.deletions), 0),
+                func.count(distinct(Contribution.repo_name)),
+            )
+            .where(*scope)
+            .group_by(Contribution.user_id, day)
+        )
+    )
+
+
+def rebuild_user_stats(db: Session, user_id: Optional[int] = None):
+    """
+    Recompute user_stats from contributions, for one user or everyone.
+    
+    Takes the same lock as rebuild_daily_activity, so both can be rebuilt
+    in one transaction.
+    """
+    db.execute(text("LOCK TABLE contributions IN SHARE MODE"))
+    
+    query = db.query(UserStats)
+    if user_id is not None:
+        query = query.filter(UserStats.user_id == user_id)
+    query.delete(synchronize_session=False)
+    
+    db.execute(
+        insert(UserStats).from_select(
+            [
+                "user_id",
+                "total_contributions",
+                "total_additions",
+                "total_deletions",
+                "last_commit_date",
+            ],
+            select(
+                Contribution.user_id,
+                func.count(),
+                func.coalesce(func.sum(Contribution.additions), 0),
+                func.coalesce(func.sum(Contribution.deletions), 0),
+                func.max(Contribution.commit_date),
+            )
+            .where(*([] if user_id is None else [Contribution.user_id == user_id]))
+            .group_by(Contribution.user_id)
+        )
+    )
@@ -0,0 +1,146 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Check the LRU cap once per this many writes rather than on every insert
+PRUNE_EVERY = 100
+# Per-file fields kept from a commit's details; patches are dropped
+FILE_FIELDS = ("filename", "status", "additions", "deletions", "changes")
+
+
+def trim_commit_details(sha: str, details: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a commit details payload to the fields the sync relies on."""
+    return {
+        "sha": details.get("sha", sha),
+        "stats": details.get("stats", {}),
+        "files": [
+            {key: file.get(key) for key in FILE_FIELDS}
+            for file in details.get("files", [])
+        ],
+    }
+
+
+class CommitDetailCache:
+    """
+    Persistent, content-addressed cache of commit details keyed by SHA.
+    
+    A commit's details never change once its SHA exists, so entries are never
+    revalidated; the on-disk SQLite store is only bounded by an LRU entry cap.
+    Only the fields the sync uses are kept, so file patches are dropped.
+    """
+    
+    def __init__(
+        self,
+        path: str = settings.GITHUB_COMMIT_CACHE_PATH,
+        max_entries: int = settings.GITHUB_COMMIT_CACHE_MAX_ENTRIES
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._writes_since_prune = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+    
+    def _connection(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so each process opens its own
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, timeout=5.0, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS commit_details ("
+                "sha TEXT PRIMARY KEY, payload TEXT NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_commit_details_accessed_at "
+                "ON commit_details (accessed_at)"
+            )
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+    
+    def get(self, sha: str) -> Optional[Dict[str, Any]]:
+        """Return cached details for a commit, counting the hit or miss."""
+        if not self.enabled:
+            return None
+        
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute(
+                    "SELECT payload FROM commit_details WHERE sha = ?", (sha,)
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE commit_details SET accessed_at = ? WHERE sha = ?",
+                        (time.time(), sha)
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"Commit cache lookup failed: {e}")
+            row = None
+        
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+    
+    def set(self, sha: str, details: Dict[str, Any]):
+        """Store the parts of a commit's details that the sync relies on."""
+        if not self.enabled:
+            return
+        
+        payload = json.dumps(trim_commit_details(sha, details))
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO commit_details (sha, payload, accessed_at) "
+                    "VALUES (?, ?, ?)",
+                    (sha, payload, time.time())
+                )
+                self._writes_since_prune += 1
+                if self._writes_since_prune >= PRUNE_EVERY:
+                    self._writes_since_prune = 0
+                    self._prune(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Commit cache store failed: {e}")
+    
+    def _prune(self, conn: sqlite3.Connection):
+        (entry_count,) = conn.execute("SELECT COUNT(*) FROM commit_details").fetchone()
+        if entry_count > self.max_entries:
+            conn.execute(
+                "DELETE FROM commit_details WHERE sha IN ("
+                "SELECT sha FROM commit_details ORDER BY accessed_at LIMIT ?)",
+                (entry_count - self.max_entries,)
+            )
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process; every hit is one API call saved."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+commit_detail_cache = CommitDetailCache()
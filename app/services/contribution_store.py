@@ -0,0 +1,120 @@
+import logging
+from typing import Any, Dict, Iterable, List, Set
+from sqlalchemy import bindparam, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from ..models import Contribution
+from .activity_rollup import record_new_contributions, record_stat_changes
+
+logger = logging.getLogger(__name__)
+
+
+def get_known_shas(db: Session, shas: Iterable[str]) -> Set[str]:
+    """Return the subset of ``shas`` that already have a Contribution row."""
+    shas = list(shas)
+    if not shas:
+        return set()
+    
+    rows = db.query(Contribution.commit_sha).filter(
+        Contribution.commit_sha.in_(shas)
+    ).all()
+    return {row.commit_sha for row in rows}
+
+
+def insert_contributions(db: Session, rows: List[Dict[str, Any]]) -> int:
+    """
+    Bulk insert contribution rows, skipping any commit_sha already stored.
+    
+    Uses a single ``INSERT ... ON CONFLICT (commit_sha) DO NOTHING`` so that
+    concurrent syncs racing on the same commit cannot fail on the unique
+    constraint. The rows actually inserted are folded into the daily rollup
+    and user stats in the same transaction. Returns the number of rows
+    actually inserted.
+    """
+    if not rows:
+        return 0
+    
+    stmt = (
+        insert(Contribution)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[Contribution.commit_sha])
+        .returning(
+            Contribution.user_id,
+            Contribution.commit_date,
+            Contribution.additions,
+            Contribution.deletions,
+            Contribution.repo_name
+        )
+    )
+    inserted = db.execute(stmt).all()
+    record_new_contributions(db, inserted)
+    return len(inserted)
+
+
+def get_unenriched_shas(db: Session, shas: Iterable[str]) -> Set[str]:
+    """Return the subset of ``shas`` whose rows have no line stats yet."""
+    shas = list(shas)
+    if not shas:
+        return set()
+    
+    rows = db.query(Contribution.commit_sha).filter(
+        Contribution.commit_sha.in_(shas),
+        Contribution.additions == 0,
+        Contribution.deletions == 0
+    ).all()
+    return {row.commit_sha for row in rows}
+
+
+def update_contribution_stats(db: Session, stats: List[Dict[str, Any]]) -> int:
+    """
+    Set additions, deletions and files_changed on existing rows by commit_sha.
+    
+    ``stats`` entries carry ``commit_sha``, ``additions``, ``deletions`` and
+    ``files_changed``; all rows are updated in one executemany round trip,
+    and the changes are applied to the daily rollup and user stats. Returns
+    the number of rows updated.
+    """
+    if not stats:
+        return 0
+    
+    # Lock the rows so the rollup deltas are taken against the values replaced
+    current = {
+        row.commit_sha: row
+        for row in db.query(
+            Contribution.commit_sha,
+            Contribution.user_id,
+            Contribution.commit_date,
+            Contribution.additions,
+            Contribution.deletions
+        ).filter(
+            Contribution.commit_sha.in_([entry["commit_sha"] for entry in stats])
+        ).with_for_update()
+    }
+    stats = [entry for entry in stats if entry["commit_sha"] in current]
+    if not stats:
+        return 0
+    
+    table = Contribution.__table__
+    stmt = (
+        update(table)
+        .where(table.c.commit_sha == bindparam("b_commit_sha"))
+        .values(
+            additions=bindparam("b_additions"),
+            deletions=bindparam("b_deletions"),
+            files_changed=bindparam("b_files_changed"),
+        )
+    )
+    result = db.execute(stmt, [
+        {f"b_{key}": value for key, value in entry.items()} for entry in stats
+    ])
+    
+    record_stat_changes(db, [
+        (
+            current[entry["commit_sha"]].user_id,
+            current[entry["commit_sha"]].commit_date,
+            entry["additions"] - (current[entry["commit_sha"]].additions or 0),
+            entry["deletions"] - (current[entry["commit_sha"]].deletions or 0),
+        )
+        for entry in stats
+    ])
+    return result.rowcount
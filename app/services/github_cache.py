@@ -0,0 +1,95 @@
+import hashlib
+import logging
+import time
+from typing import Dict, Optional
+import redis
+import redis.asyncio
+from ..core.config import settings
+from ..core.redis import async_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class GitHubResponseCache:
+    """
+    Redis-backed store of ETags and payloads for conditional GitHub requests.
+    
+    Each cached URL is a hash holding its ``etag``, raw ``body`` and the
+    ``next`` page URL from its Link header, expired after ``ttl`` seconds.
+    A sorted set indexes entries by last use so the least recently used ones
+    are evicted once ``max_entries`` is exceeded.
+    """
+    
+    KEY_PREFIX = "github:etag:"
+    INDEX_KEY = "github:etag:index"
+    POLL_PREFIX = "github:poll:"
+    
+    def __init__(
+        self,
+        client: redis.asyncio.Redis = async_redis_client,
+        ttl: int = settings.GITHUB_ETAG_CACHE_TTL,
+        max_entries: int = settings.GITHUB_ETAG_CACHE_MAX_ENTRIES,
+        max_entry_bytes: int = settings.GITHUB_ETAG_CACHE_MAX_ENTRY_BYTES
+    ):
+        self.client = client
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_entry_bytes = max_entry_bytes
+    
+    def key_for(self, url: str) -> str:
+        return self.KEY_PREFIX + hashlib.sha1(url.encode()).hexdigest()
+    
+    async def get(self, key: str) -> Optional[Dict[str, str]]:
+        """Return the cached ``etag``, ``body`` and ``next`` for a key, if present."""
+        try:
+            entry = await self.client.hgetall(key)
+            # Entries written before the next-page URL was stored would
+            # end paging after their page on a 304, so treat them as misses
+            if not entry or "next" not in entry:
+                return None
+            await self.client.zadd(self.INDEX_KEY, {key: time.time()})
+            return entry
+        except redis.RedisError as e:
+            logger.warning(f"ETag cache lookup failed: {e}")
+            return None
+    
+    async def set(self, key: str, etag: str, body: str, next_url: str = ""):
+        """Store a response, then evict expired and least recently used entries."""
+        if len(body) > self.max_entry_bytes:
+            return
+        
+        now = time.time()
+        try:
+            pipe = self.client.pipeline()
+            pipe.hset(key, mapping={"etag": etag, "body": body, "next": next_url})
+            pipe.expire(key, self.ttl)
+            pipe.zadd(self.INDEX_KEY, {key: now})
+            pipe.zremrangebyscore(self.INDEX_KEY, "-inf", now - self.ttl)
+            pipe.zcard(self.INDEX_KEY)
+            entry_count = (await pipe.execute())[-1]
+            
+            if entry_count > self.max_entries:
+                evicted = await self.client.zpopmin(self.INDEX_KEY, entry_count - self.max_entries)
+                if evicted:
+                    await self.client.delete(*(evicted_key for evicted_key, _ in evicted))
+        except redis.RedisError as e:
+            logger.warning(f"ETag cache store failed: {e}")
+
+    
+    async def poll_due(self, path: str) -> bool:
+        """Whether the poll interval GitHub asked for on ``path`` has elapsed."""
+        try:
+            return not await self.client.exists(self.POLL_PREFIX + path)
+        except redis.RedisError as e:
+            logger.warning(f"Poll interval lookup failed: {e}")
+            return True
+    
+    async def defer_poll(self, path: str, seconds: int):
+        """Hold off polling ``path`` again for ``seconds``."""
+        try:
+            await self.client.set(self.POLL_PREFIX + path, 1, ex=max(seconds, 1))
+        except redis.RedisError as e:
+            logger.warning(f"Poll interval store failed: {e}")
+
+
+github_response_cache = GitHubResponseCache()
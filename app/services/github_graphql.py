@@ -0,0 +1,102 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# Largest page GitHub allows on a history connection
+HISTORY_PAGE_SIZE = 100
+
+USER_ID_QUERY = """
+query($login: String!) {
+  user(login: $login) { id }
+}
+"""
+
+HISTORY_FRAGMENT = """
+fragment HistoryPage on CommitHistoryConnection {
+  pageInfo { hasNextPage endCursor }
+  nodes {
+    oid
+    message
+    url
+    authoredDate
+    additions
+    deletions
+    changedFilesIfAvailable
+  }
+}
+"""
+
+
+def build_history_query(
+    repos: List[Tuple[str, str, datetime, Optional[str]]],
+    author_id: str
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Build one query fetching a page of commit history for several repos.
+    
+    ``repos`` holds ``(owner, name, since, cursor)`` tuples; repository ``i``
+    is aliased ``r{i}`` in the response. Returns the query and its variables.
+    """
+    declarations = ["$authorId: ID!"]
+    selections = []
+    variables: Dict[str, Any] = {"authorId": author_id}
+    
+    for i, (owner, name, since, cursor) in enumerate(repos):
+        declarations += [
+            f"$owner{i}: String!",
+            f"$name{i}: String!",
+            f"$since{i}: GitTimestamp!",
+            f"$cursor{i}: String",
+        ]
+        variables.update({
+            f"owner{i}": owner,
+            f"name{i}": name,
+            f"since{i}": since.isoformat(),
+            f"cursor{i}": cursor,
+        })
+        selections.append(
+            f"  r{i}: repository(owner: $owner{i}, name: $name{i}) {{\n"
+            f"    defaultBranchRef {{ target {{ ... on Commit {{\n"
+            f"      history(first: {HISTORY_PAGE_SIZE}, since: $since{i}, "
+            f"author: {{id: $authorId}}, after: $cursor{i}) {{ ...HistoryPage }}\n"
+            f"    }} }} }}\n"
+            f"  }}"
+        )
+    
+    query = (
+        f"query({', '.join(declarations)}) {{\n"
+        + "\n".join(selections)
+        + "\n}\n"
+        + HISTORY_FRAGMENT
+    )
+    return query, variables
+
+
+def extract_history(repository: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Return the history connection from an aliased repository result."""
+    if not repository:
+        return None
+    branch = repository.get("defaultBranchRef")
+    if not branch:
+        # Empty repository: nothing to page through
+        return {"pageInfo": {"hasNextPage": False, "endCursor": None}, "nodes": []}
+    return (branch.get("target") or {}).get("history")
+
+
+def history_node_to_row(
+    user_id: int,
+    repo_data: Dict[str, Any],
+    node: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Build a contributions row from a GraphQL commit history node."""
+    return {
+        "user_id": user_id,
+        "repo_name": repo_data["full_name"],
+        "repo_url": repo_data["html_url"],
+        "commit_sha": node["oid"],
+        "commit_message": node["message"],
+        "commit_url": node["url"],
+        "commit_date": datetime.fromisoformat(node["authoredDate"].replace("Z", "+00:00")),
+        "additions": node.get("additions") or 0,
+        "deletions": node.get("deletions") or 0,
+        "files_changed": node.get("changedFilesIfAvailable") or 0,
+    }
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+from typing import Optional
+import httpx
+import redis
+import redis.asyncio
+from ..core.config import settings
+from ..core.redis import async_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Assumed quota until GitHub's headers tell us otherwise
+DEFAULT_LIMIT = 5000
+DEFAULT_WINDOW = 3600
+# GitHub asks clients to wait at least a minute after a secondary limit
+SECONDARY_LIMIT_WAIT = 60
+# Upper bound on a single sleep so waiting workers re-check shared state
+MAX_SLEEP = 30.0
+
+# Token bucket refilled at (remaining - reserve) / seconds-until-reset, so the
+# whole cluster spends the quota evenly across the window. Returns the number
+# of seconds to wait before retrying, or 0 when a token was taken.
+ACQUIRE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local burst = tonumber(ARGV[1])
+local reserve = tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'remaining', 'reset', 'tokens', 'updated', 'blocked_until')
+
+local blocked_until = tonumber(state[5]) or 0
+if blocked_until > now then
+    return tostring(blocked_until - now)
+end
+
+local remaining = tonumber(state[1])
+local reset = tonumber(state[2])
+if remaining == nil or reset == nil or reset <= now then
+    remaining = tonumber(ARGV[3])
+    reset = now + tonumber(ARGV[4])
+    redis.call('HSET', KEYS[1], 'estimated', 1)
+end
+
+local updated = tonumber(state[4]) or now
+local rate = math.max(remaining - reserve, 0) / math.max(reset - now, 1)
+local tokens = math.min(burst, (tonumber(state[3]) or burst) + (now - updated) * rate)
+
+local wait = 0
+if tokens >= 1 and remaining > reserve then
+    tokens = tokens - 1
+    remaining = remaining - 1
+elseif rate > 0 then
+    wait = (1 - tokens) / rate
+else
+    wait = reset - now
+end
+
+redis.call('HSET', KEYS[1], 'remaining', remaining, 'reset', reset, 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], 2 * tonumber(ARGV[4]))
+return tostring(wait)
+"""
+
+# Folds a response's X-RateLimit-* / Retry-After headers into the shared
+# state. Responses arrive out of order, so within one window the lowest
+# remaining count wins; a later reset means GitHub started a new window.
+# An exhausted quota needs no special casing: acquire waits for the reset.
+OBSERVE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+if ARGV[1] ~= '' then
+    local remaining = tonumber(ARGV[1])
+    local reset = tonumber(ARGV[2])
+    local state = redis.call('HMGET', KEYS[1], 'remaining', 'reset', 'estimated')
+    local current_remaining = tonumber(state[1])
+    local current_reset = tonumber(state[2]) or 0
+    if state[3] or current_remaining == nil or reset > current_reset then
+        redis.call('HSET', KEYS[1], 'remaining', remaining, 'reset', reset)
+        redis.call('HDEL', KEYS[1], 'estimated')
+    else
+        -- A 304 was counted locally by acquire but not by GitHub
+        local refund = tonumber(ARGV[3])
+        redis.call('HSET', KEYS[1], 'remaining', math.min(current_remaining + refund, remaining))
+    end
+end
+
+if ARGV[4] ~= '' then
+    local blocked_until = now + tonumber(ARGV[4])
+    local current = tonumber(redis.call('HGET', KEYS[1], 'blocked_until')) or 0
+    if blocked_until > current then
+        redis.call('HSET', KEYS[1], 'blocked_until', blocked_until)
+    end
+end
+return 1
+"""
+
+
+class GitHubRateLimiter:
+    """
+    Cluster-wide governor for GitHub API calls, shared through Redis.
+    
+    Every process calls ``acquire`` before a request and ``observe`` with the
+    response, so all workers pace themselves against the same view of the
+    quota instead of exhausting it together and stalling in lockstep. Both
+    go through the async client, so a sync waiting on Redis yields the loop.
+    """
+    
+    KEY_PREFIX = "github:ratelimit:"
+    
+    def __init__(
+        self,
+        client: redis.asyncio.Redis = async_redis_client,
+        burst: int = settings.GITHUB_RATE_LIMIT_BURST,
+        reserve: int = settings.GITHUB_RATE_LIMIT_RESERVE
+    ):
+        self.client = client
+        self.burst = burst
+        self.reserve = reserve
+        self._acquire = client.register_script(ACQUIRE_SCRIPT)
+        self._observe = client.register_script(OBSERVE_SCRIPT)
+    
+    async def acquire(self, resource: str = "core"):
+        """Wait until the shared bucket for ``resource`` grants a request."""
+        key = self.KEY_PREFIX + resource
+        while True:
+            try:
+                wait = float(await self._acquire(
+                    keys=[key],
+                    args=[self.burst, self.reserve, DEFAULT_LIMIT, DEFAULT_WINDOW]
+                ))
+            except redis.RedisError as e:
+                # Fail open: losing the governor must not stop syncing
+                logger.warning(f"Rate limiter unavailable, proceeding: {e}")
+                return
+            
+            if wait <= 0:
+                return
+            logger.debug(f"GitHub {resource} quota throttled; waiting {wait:.1f}s")
+            await asyncio.sleep(min(wait, MAX_SLEEP))
+    
+    async def observe(self, response: httpx.Response, resource: str = "core") -> bool:
+        """
+        Record a response's rate-limit headers in the shared state.
+        
+        Returns True when the response was rejected by a primary or secondary
+        rate limit and the request should be retried after ``acquire``.
+        """
+        headers = response.headers
+        resource = headers.get("X-RateLimit-Resource", resource)
+        remaining = headers.get("X-RateLimit-Remaining", "")
+        reset = headers.get("X-RateLimit-Reset", "")
+        
+        rate_limited = False
+        retry_after = ""
+        if response.status_code in (403, 429):
+            if "Retry-After" in headers:
+                retry_after = headers["Retry-After"]
+                rate_limited = True
+            elif remaining == "0":
+                rate_limited = True
+            elif "secondary rate limit" in response.text.lower():
+                retry_after = str(SECONDARY_LIMIT_WAIT)
+                rate_limited = True
+        
+        try:
+            await self._observe(
+                keys=[self.KEY_PREFIX + resource],
+                args=[
+                    remaining if reset else "",
+                    reset,
+                    "1" if response.status_code == 304 else "0",
+                    retry_after,
+                ]
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Failed to record GitHub rate limit state: {e}")
+        
+        return rate_limited
+
+
+github_rate_limiter = GitHubRateLimiter()
@@ -1,23 +1,175 @@
+import asyncio
+import contextlib
 import httpx
+import json
 import logging
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Callable, Tuple, AsyncIterator, NamedTuple
 from sqlalchemy.orm import Session
 from ..core.config import settings
-from ..models import User, Contribution
-from ..schemas import ContributionCreate
+from ..models import User, RepoSyncState, UserSyncState
+from .contribution_store import get_known_shas, insert_contributions
+from .commit_cache import CommitDetailCache, commit_detail_cache, trim_commit_details
+from .github_cache import GitHubResponseCache, github_response_cache
+from .github_ratelimit import GitHubRateLimiter, github_rate_limiter
+from .sync_checkpoint import SyncCheckpointStore, sync_checkpoint_store
+from .sync_progress import SyncProgress
+from .sync_schedule import schedule_next_sync
+from .sync_state import load_repo_states, record_repo_synced, record_user_synced
+from .github_graphql import (
+    USER_ID_QUERY,
+    build_history_query,
+    extract_history,
+    history_node_to_row,
+)
 
 logger = logging.getLogger(__name__)
 
+# GitHub's maximum page size; commits are deduplicated and stored per page
+PAGE_SIZE = 100
+
+# Limits of the user events feed
+EVENTS_MAX = 300
+EVENTS_RETENTION_DAYS = 90
+
+# Bounds concurrent GitHub requests made on behalf of the current sync
+_request_slots: ContextVar[Optional[asyncio.Semaphore]] = ContextVar(
+    "github_request_slots", default=None
+)
+# Progress of the sync the current request is made on behalf of
+_sync_progress: ContextVar[Optional[SyncProgress]] = ContextVar(
+    "github_sync_progress", default=None
+)
+
 
 class GitHubSyncService:
-    def __init__(self):
+    def __init__(
+        self,
+        response_cache: GitHubResponseCache = github_response_cache,
+        rate_limiter: GitHubRateLimiter = github_rate_limiter,
+        commit_cache: CommitDetailCache = commit_detail_cache,
+        checkpoints: SyncCheckpointStore = sync_checkpoint_store
+    ):
         self.token = settings.GITHUB_TOKEN
-        self.base_url = "https://api.github.com"
+        self.base_url = settings.GITHUB_API_URL
         self.headers = {
             "Authorization": f"token {self.token}",
             "Accept": "application/vnd.github.v3+json"
         }
+        self.response_cache = response_cache
+        self.rate_limiter = rate_limiter
+        self.commit_cache = commit_cache
+        self.checkpoints = checkpoints
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Shared, connection-pooled client used for every GitHub request.
+        
+        The client is created lazily and bound to the running event loop; if
+        the service is reused from a different loop a fresh client is built.
+        """
+        loop = asyncio.get_running_loop()
+        if (
+            self._client is None
+            or self._client.is_closed
+            or self._client_loop is not loop
+        ):
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                http2=settings.GITHUB_HTTP2,
+                limits=httpx.Limits(
+                    max_connections=settings.GITHUB_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.GITHUB_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.GITHUB_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(
+                    settings.GITHUB_TIMEOUT,
+                    connect=settings.GITHUB_CONNECT_TIMEOUT,
+                ),
+            )
+            self._client_loop = loop
+        return self._client
+    
+    async def aclose(self):
+        """Close the shared HTTP client and release its pooled connections."""
+        client, loop = self._client, self._client_loop
+        self._client = None
+        self._client_loop = None
+        
+        if client is None or client.is_closed:
+            return
+        if loop is not asyncio.get_running_loop():
+            # Connections belong to another (possibly closed) loop; drop them.
+            logger.warning("Discarding GitHub client bound to a different event loop")
+            return
+        await client.aclose()
+    
+    async def _send(
+        self,
+        request: httpx.Request,
+        resource: str = "core"
+    ) -> httpx.Response:
+        """
+        Send a request through the cluster-wide rate-limit governor.
+        
+        Requests rejected by a primary or secondary rate limit are retried
+        once the shared governor allows it. Inside a sync, the number of
+        requests in flight is bounded by that sync's request slots.
+        """
+        slots = _request_slots.get()
+        async with slots if slots is not None else contextlib.nullcontext():
+            for attempt in range(settings.GITHUB_RATE_LIMIT_MAX_RETRIES + 1):
+                await self.rate_limiter.acquire(resource)
+                response = await self.client.send(request)
+                progress = _sync_progress.get()
+                if progress is not None:
+                    progress.record_api_call(response)
+                if not await self.rate_limiter.observe(response, resource):
+                    break
+                logger.warning(
+                    f"GitHub rate limit hit for {request.url.path} "
+                    f"(attempt {attempt + 1}); backing off"
+                )
+        return response
+    
+    async def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> httpx.Response:
+        return await self._send(self.client.build_request("GET", path, params=params))
+    
+    async def _get_json_conditional(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> "ListPage":
+        """
+        GET a list endpoint, revalidating against the ETag cache.
+        
+        A 304 answer does not count against the rate limit, so unchanged
+        pages are served from the cached payload instead.
+        """
+        request = self.client.build_request("GET", path, params=params)
+        cache_key = self.response_cache.key_for(str(request.url))
+        cached = await self.response_cache.get(cache_key)
+        if cached:
+            request.headers["If-None-Match"] = cached["etag"]
+        
+        response = await self._send(request)
+        if response.status_code == 304 and cached:
+            return ListPage(
+                json.loads(cached["body"]), cached.get("next") or None, response.headers
+            )
+        
+        response.raise_for_status()
+        next_url = response.links.get("next", {}).get("url")
+        etag = response.headers.get("ETag")
+        if etag:
+            await self.response_cache.set(cache_key, etag, response.text, next_url or "")
+        return ListPage(response.json(), next_url, response.headers)
     
     async def get_authenticated_user(self) -> Optional[Dict[str, Any]]:
         """Get the authenticated GitHub user information."""
@@ -25,86 +177,154 @@ class GitHubSyncService:
             logger.error("GitHub token not configured")
             return None
             
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.base_url}/user", 
-                    headers=self.headers
+        try:
+            response = await self._get("/user")
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to get authenticated user: {e}")
+            return None
+    
+    async def _paginate_pages(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        start_url: Optional[str] = None
+    ) -> AsyncIterator["ListPage"]:
+        """
+        Yield the pages of a list endpoint, following ``Link: rel="next"``.
+        
+        The next page is requested before the current one is yielded, so the
+        caller works on one page while the next is in flight, and paging
+        stops at the last real page instead of requesting an empty one.
+        Paging starts from ``start_url`` instead when resuming.
+        """
+        fetch = asyncio.ensure_future(
+            self._get_json_conditional(start_url) if start_url
+            else self._get_json_conditional(path, params)
+        )
+        try:
+            while fetch is not None:
+                page = await fetch
+                fetch = (
+                    asyncio.ensure_future(self._get_json_conditional(page.next_url))
+                    if page.next_url else None
                 )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPError as e:
-                logger.error(f"Failed to get authenticated user: {e}")
-                return None
-    
-    async def get_user_repos(self, username: str) -> List[Dict[str, Any]]:
-        """Get all repositories for a user."""
-        repos = []
-        page = 1
-        per_page = 100
-        
-        async with httpx.AsyncClient() as client:
-            while True:
-                try:
-                    response = await client.get(
-                        f"{self.base_url}/users/{username}/repos",
-                        headers=self.headers,
-                        params={"page": page, "per_page": per_page, "sort": "updated"}
-                    )
-                    response.raise_for_status()
-                    page_repos = response.json()
-                    
-                    if not page_repos:
-                        break
-                        
-                    repos.extend(page_repos)
-                    page += 1
-                    
-                except httpx.HTTPError as e:
-                    logger.error(f"Failed to get repos for {username}: {e}")
-                    break
-                    
-        return repos
+                yield page
+        finally:
+            if fetch is not None:
+                fetch.cancel()
+    
+    async def _paginate(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield the non-empty payloads of a list endpoint's pages."""
+        async for page in self._paginate_pages(path, params):
+            if page.payload:
+                yield page.payload
     
-    async def get_commits_for_repo(
+    def iter_user_repos(self, username: str) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield a user's repositories page by page."""
+        return self._paginate(
+            f"/users/{username}/repos",
+            params={"per_page": PAGE_SIZE, "sort": "updated"}
+        )
+    
+    def iter_commits_for_repo(
         self, 
         owner: str, 
         repo: str, 
         author: str, 
+        since: datetime,
+        start_url: Optional[str] = None
+    ) -> AsyncIterator["ListPage"]:
+        """
+        Yield a repository's commits by ``author`` since a date, page by page.
+        
+        Each page carries the URL of the next one, which a checkpoint can
+        later pass back as ``start_url`` to resume the listing there.
+        """
+        return self._paginate_pages(
+            f"/repos/{owner}/{repo}/commits",
+            params={
+                "author": author,
+                "since": since.isoformat(),
+                "per_page": PAGE_SIZE
+            },
+            start_url=start_url
+        )
+    
+    async def get_pushed_repos(
+        self,
+        username: str,
         since: datetime
-    ) -> List[Dict[str, Any]]:
-        """Get commits for a specific repository."""
-        commits = []
-        page = 1
-        per_page = 100
-        
-        async with httpx.AsyncClient() as client:
-            while True:
-                try:
-                    response = await client.get(
-                        f"{self.base_url}/repos/{owner}/{repo}/commits",
-                        headers=self.headers,
-                        params={
-                            "author": author,
-                            "since": since.isoformat(),
-                            "page": page,
-                            "per_page": per_page
-                        }
-                    )
-                    response.raise_for_status()
-                    page_commits = response.json()
-                    
-                    if not page_commits:
+    ) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Find the repos a user pushed to after ``since`` via their event feed.
+        
+        Returns repo records keyed by full name, shaped like the repos
+        listing, with ``pushed_at`` set to the latest push seen. Returns None
+        if the feed could not be read or does not reach back to ``since``.
+        """
+        path = f"/users/{username}/events"
+        events_seen = 0
+        reached_since = False
+        pushed: Dict[str, Dict[str, Any]] = {}
+        
+        try:
+            first_page = await self._get_json_conditional(path, params={"per_page": PAGE_SIZE})
+            await self.response_cache.defer_poll(
+                path,
+                int(first_page.headers.get("X-Poll-Interval", settings.GITHUB_EVENTS_POLL_INTERVAL))
+            )
+            
+            async def event_pages():
+                yield first_page.payload
+                if first_page.next_url:
+                    async for page in self._paginate(first_page.next_url):
+                        yield page
+            
+            # Events are newest first; stop paging once past ``since``
+            async with contextlib.aclosing(event_pages()) as pages:
+                async for page in pages:
+                    for event in page:
+                        events_seen += 1
+                        created_at = _parse_timestamp(event["created_at"])
+                        if created_at <= since:
+                            reached_since = True
+                            break
+                        if event["type"] == "PushEvent":
+                            self._record_push(pushed, event["repo"]["name"], created_at)
+                    if reached_since:
                         break
-                        
-                    commits.extend(page_commits)
-                    page += 1
-                    
-                except httpx.HTTPError as e:
-                    logger.error(f"Failed to get commits for {owner}/{repo}: {e}")
-                    break
-                    
-        return commits
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to get events for {username}: {e}")
+            return None
+        
+        # The feed holds at most 300 events from the last 90 days
+        feed_start = datetime.now(timezone.utc) - timedelta(days=EVENTS_RETENTION_DAYS)
+        if not reached_since and (events_seen >= EVENTS_MAX or since < feed_start):
+            return None
+        return pushed
+    
+    @staticmethod
+    def _record_push(
+        pushed: Dict[str, Dict[str, Any]],
+        repo_name: str,
+        created_at: datetime
+    ):
+        owner, name = repo_name.split("/", 1)
+        repo_data = pushed.setdefault(repo_name, {
+            "full_name": repo_name,
+            "name": name,
+            "owner": {"login": owner},
+            "html_url": f"https://github.com/{repo_name}",
+            "pushed_at": None,
+        })
+        if repo_data["pushed_at"] is None or _parse_timestamp(repo_data["pushed_at"]) < created_at:
+            repo_data["pushed_at"] = created_at.isoformat()
     
     async def get_commit_details(
         self, 
@@ -112,114 +332,748 @@ class GitHubSyncService:
         repo: str, 
         sha: str
     ) -> Optional[Dict[str, Any]]:
-        """Get detailed information about a specific commit."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.base_url}/repos/{owner}/{repo}/commits/{sha}",
-                    headers=self.headers
-                )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPError as e:
-                logger.error(f"Failed to get commit details for {sha}: {e}")
-                return None
+        """
+        Get detailed information about a specific commit.
+        
+        Details are served from the local commit cache when possible. Either
+        way only ``sha``, ``stats`` and per-file metadata are returned, never
+        patches, so callers see the same shape on a hit and a miss.
+        """
+        # The cache is a local SQLite file; keep its I/O off the event loop
+        cached = await asyncio.to_thread(self.commit_cache.get, sha)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = await self._get(f"/repos/{owner}/{repo}/commits/{sha}")
+            response.raise_for_status()
+            details = trim_commit_details(sha, response.json())
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to get commit details for {sha}: {e}")
+            return None
+        
+        await asyncio.to_thread(self.commit_cache.set, sha, details)
+        return details
+    
+    async def graphql(
+        self,
+        query: str,
+        variables: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Run a GraphQL query and return the full response payload.
+        
+        The payload may carry both ``data`` and ``errors`` when only part of
+        the query failed. Returns None if the request itself failed.
+        """
+        request = self.client.build_request(
+            "POST", "/graphql", json={"query": query, "variables": variables}
+        )
+        try:
+            response = await self._send(request, resource="graphql")
+            response.raise_for_status()
+            payload = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            logger.error(f"GitHub GraphQL request failed: {e}")
+            return None
+        
+        for error in payload.get("errors") or []:
+            logger.warning(f"GitHub GraphQL error: {error.get('message')}")
+        return payload
     
     async def sync_user_contributions(
         self, 
         db: Session, 
         username: str, 
-        days_back: int = 30
+        days_back: int = 30,
+        progress: Optional[SyncProgress] = None
     ) -> int:
-        """Sync contributions for a specific user."""
+        """
+        Sync contributions for a specific user.
+        
+        Pass a ``progress`` tracker to have the sync publish live counters.
+        """
         logger.info(f"Starting GitHub sync for user: {username}")
         
-        # Get or create user
-        user = db.query(User).filter(User.github_username == username).first()
+        # Get or create user; Session calls run in a thread so the shared
+        # event loop keeps serving other syncs while the database answers
+        user = await asyncio.to_thread(_read_and_release, db, _find_user, username)
         if not user:
             # Get user info from GitHub
             user_info = await self.get_authenticated_user()
-            if not user_info and username:
-                # Fallback: create user with minimal info
-                user = User(github_username=username)
-                db.add(user)
-                db.commit()
-                db.refresh(user)
-            elif user_info:
-                user = User(
-                    github_username=user_info["login"],
-                    email=user_info.get("email"),
-                    full_name=user_info.get("name"),
-                    avatar_url=user_info.get("avatar_url"),
-                    github_id=user_info["id"]
-                )
-                db.add(user)
-                db.commit()
-                db.refresh(user)
+            if user_info or username:
+                user = await asyncio.to_thread(_create_user, db, username, user_info)
         
         if not user:
             logger.error(f"Could not create or find user: {username}")
             return 0
         
-        # Calculate date range
-        since = datetime.utcnow() - timedelta(days=days_back)
+        return await self._sync_repos(
+            db, user, days_back, self.iter_user_repos(username), progress
+        )
+    
+    async def sync_recent_activity(
+        self,
+        db: Session,
+        username: str,
+        days_back: int = 30,
+        progress: Optional[SyncProgress] = None
+    ) -> int:
+        """
+        Fast-path sync that only touches repos pushed to since the last sync.
         
-        # Get user repositories
-        repos = await self.get_user_repos(username)
-        contributions_count = 0
+        Pushes are found through the user's event feed, which is conditional
+        on its ETag and polled no more often than GitHub's X-Poll-Interval.
+        Falls back to a full sync when the user has never been synced or the
+        feed does not reach back to the last sync.
+        """
+        user, state = await asyncio.to_thread(
+            _read_and_release, db, _find_user_sync_state, username
+        )
+        if state is None or state.last_synced_at is None:
+            return await self.sync_user_contributions(db, username, days_back, progress)
+        
+        if not await self.response_cache.poll_due(f"/users/{username}/events"):
+            logger.info(f"Event feed for {username} polled recently; skipping")
+            return 0
+        
+        checked_at = datetime.now(timezone.utc)
+        # Events can surface a while after they happen, so look back further
+        # than the last sync; repos already synced are skipped by watermark
+        lookback = timedelta(hours=settings.GITHUB_EVENTS_LOOKBACK_HOURS)
+        pushed = await self.get_pushed_repos(username, state.last_synced_at - lookback)
+        if pushed is None:
+            logger.info(f"Event feed cannot cover {username}'s last sync; running full sync")
+            return await self.sync_user_contributions(db, username, days_back, progress)
+        
+        if not pushed:
+            await asyncio.to_thread(_finish_user_sync, db, user.id, checked_at)
+            logger.info(f"No pushes for {username} since last sync")
+            return 0
+        
+        logger.info(f"Fast-path sync of {len(pushed)} pushed repos for {username}")
+        return await self._sync_repos(
+            db, user, days_back, _single_page(list(pushed.values())), progress
+        )
+    
+    async def _sync_repos(
+        self,
+        db: Session,
+        user: User,
+        days_back: int,
+        repo_pages: AsyncIterator[List[Dict[str, Any]]],
+        progress: Optional[SyncProgress] = None
+    ) -> int:
+        """Sync the repos yielded by ``repo_pages`` for a user and commit."""
+        # Commits during the sync expire ``user``; reading its attributes
+        # afterwards would reload it on the event loop
+        user_id = user.id
+        username = user.github_username
+        progress = progress or SyncProgress(None, username)
+        progress.set_stage("syncing")
+        
+        # Calculate date range; truncated to midnight so the commit listing
+        # URLs stay stable between runs and can be revalidated by ETag
+        started_at = datetime.now(timezone.utc)
+        since = _start_of_day(started_at - timedelta(days=days_back))
+        repo_states = await asyncio.to_thread(_read_and_release, db, load_repo_states, user_id)
+        # Cursors left by an interrupted run over the same window
+        resume_points = await self.checkpoints.load(user_id, since)
+        if resume_points:
+            logger.info(f"Resuming sync for {username} in {len(resume_points)} repos")
         
+        # Every request made on behalf of this sync shares one pool of slots
+        slots_token = _request_slots.set(
+            asyncio.Semaphore(settings.GITHUB_SYNC_CONCURRENCY)
+        )
+        progress_token = _sync_progress.set(progress)
+        try:
+            # Repos are synced page by page as the listing streams in; all
+            # Session access goes through the writer so the Session itself is
+            # never shared between tasks.
+            async with SessionWriter(db) as writer:
+                run = SyncRun(
+                    writer, user_id, username, since, started_at, progress, resume_points
+                )
+                repo_tasks = []
+                repos_seen = 0
+                async with asyncio.TaskGroup() as tg:
+                    try:
+                        async for repos in repo_pages:
+                            repos_seen += len(repos)
+                            plans = self._plan_repos(repos, repo_states, since)
+                            progress.add_repos(len(repos), skipped=len(repos) - len(plans))
+                            if plans:
+                                repo_tasks.append(tg.create_task(self._sync_plans(run, plans)))
+                    except httpx.HTTPError as e:
+                        logger.error(f"Failed to get repos for {username}: {e}")
+                        run.incomplete = True
+        finally:
+            _sync_progress.reset(progress_token)
+            _request_slots.reset(slots_token)
+        
+        contributions_count = sum(task.result() for task in repo_tasks)
+        
+        # The fast path only looks for pushes after the last recorded sync,
+        # so a run that missed anything must not move that point forward
+        if run.incomplete:
+            logger.warning(f"GitHub sync for {username} was incomplete; keeping last sync time")
+        await asyncio.to_thread(
+            _finish_user_sync, db, user_id, started_at, not run.incomplete
+        )
+        logger.info(
+            f"Synced {contributions_count} contributions for {username} "
+            f"from {repos_seen} repos using {progress.api_calls} API calls"
+        )
+        if self.commit_cache.enabled:
+            stats = await asyncio.to_thread(self.commit_cache.stats)
+            logger.info(f"Commit detail cache: {stats}")
+        return contributions_count
+    
+    def _plan_repos(
+        self,
+        repos: List[Dict[str, Any]],
+        repo_states: Dict[str, RepoSyncState],
+        since: datetime
+    ) -> List[Tuple[Dict[str, Any], datetime]]:
+        """
+        Pair each repo with the date to query it from.
+        
+        Repos with nothing new since the last sync are left out; the rest are
+        only queried from their watermark onwards.
+        """
+        plans = []
         for repo_data in repos:
-            repo_name = repo_data["full_name"]
-            repo_url = repo_data["html_url"]
-            owner = repo_data["owner"]["login"]
-            repo = repo_data["name"]
+            repo_since = self._repo_watermark(
+                repo_states.get(repo_data["full_name"]), repo_data, since
+            )
+            if repo_since is not None:
+                plans.append((repo_data, repo_since))
+        return plans
+    
+    @staticmethod
+    def _repo_watermark(
+        state: Optional[RepoSyncState],
+        repo_data: Dict[str, Any],
+        since: datetime
+    ) -> Optional[datetime]:
+        """
+        Return the date to query a repo's commits from, or None to skip it.
+        
+        A watermark is only trusted if the window it covers reaches back to
+        ``since``. The query starts a few days before the newest commit seen,
+        because commits can be pushed some time after they were made.
+        """
+        if state is None or state.covered_since > since:
+            return since
+        
+        pushed_at = _parse_timestamp(repo_data.get("pushed_at"))
+        if pushed_at and state.pushed_at and pushed_at <= state.pushed_at:
+            return None
+        
+        watermark = state.last_commit_date or state.last_synced_at
+        overlap = timedelta(days=settings.GITHUB_WATERMARK_OVERLAP_DAYS)
+        return max(since, _start_of_day(watermark - overlap))
+    
+    async def _sync_plans(
+        self,
+        run: "SyncRun",
+        plans: List[Tuple[Dict[str, Any], datetime]]
+    ) -> int:
+        """Sync a page of planned repos, via GraphQL when enabled, else REST."""
+        if settings.GITHUB_SYNC_MODE == "graphql":
+            contributions_count, fallback_plans = await self._sync_repos_graphql(run, plans)
+        else:
+            contributions_count, fallback_plans = 0, plans
+        
+        if fallback_plans:
+            contributions_count += await self._sync_repos_rest(run, fallback_plans)
+        return contributions_count
+    
+    async def _sync_repos_rest(
+        self,
+        run: "SyncRun",
+        plans: List[Tuple[Dict[str, Any], datetime]]
+    ) -> int:
+        """Sync repos via REST: commit listings plus one detail call per commit."""
+        async with asyncio.TaskGroup() as tg:
+            repo_tasks = [
+                tg.create_task(self._sync_repo(run, repo_data, repo_since))
+                for repo_data, repo_since in plans
+            ]
+        return sum(task.result() for task in repo_tasks)
+    
+    async def _sync_repos_graphql(
+        self,
+        run: "SyncRun",
+        plans: List[Tuple[Dict[str, Any], datetime]]
+    ) -> Tuple[int, List[Tuple[Dict[str, Any], datetime]]]:
+        """
+        Sync repos via batched GraphQL history queries.
+        
+        Each query returns additions, deletions and changed files for up to
+        100 commits in each of several repos, so no per-commit detail calls
+        are needed. Returns the number of contributions stored and the repos
+        GraphQL could not serve, which the caller syncs over REST.
+        """
+        author_id = await self._get_author_id(run)
+        if not author_id:
+            logger.warning(f"Could not resolve GitHub node ID for {run.username}; using REST")
+            return 0, plans
+        
+        batch_size = settings.GITHUB_GRAPHQL_REPOS_PER_QUERY
+        batches = [plans[i:i + batch_size] for i in range(0, len(plans), batch_size)]
+        
+        async with asyncio.TaskGroup() as tg:
+            batch_tasks = [
+                tg.create_task(self._sync_graphql_batch(run, batch, author_id))
+                for batch in batches
+            ]
+        
+        contributions_count = 0
+        fallback_plans = []
+        for task in batch_tasks:
+            batch_count, batch_fallback = task.result()
+            contributions_count += batch_count
+            fallback_plans.extend(batch_fallback)
+        
+        if fallback_plans:
+            logger.warning(
+                f"GraphQL history unavailable for {len(fallback_plans)} repos of "
+                f"{run.username}; falling back to REST"
+            )
+        return contributions_count, fallback_plans
+    
+    async def _get_author_id(self, run: "SyncRun") -> Optional[str]:
+        """Resolve the user's GraphQL node ID once per sync."""
+        if run.author_lookup is None:
+            run.author_lookup = asyncio.ensure_future(
+                self.graphql(USER_ID_QUERY, {"login": run.username})
+            )
+        payload = await run.author_lookup
+        return (((payload or {}).get("data") or {}).get("user") or {}).get("id")
+    
+    async def _sync_graphql_batch(
+        self,
+        run: "SyncRun",
+        plans: List[Tuple[Dict[str, Any], datetime]],
+        author_id: str
+    ) -> Tuple[int, List[Tuple[Dict[str, Any], datetime]]]:
+        """Page through the history of a batch of repos, one query per round."""
+        contributions_count = 0
+        fallback_plans = []
+        latest_commit_dates: Dict[str, Optional[datetime]] = {}
+        pending = []
+        for repo_data, repo_since in plans:
+            resume = self._resume_point(run, repo_data, "graphql")
+            if resume:
+                latest_commit_dates[repo_data["full_name"]] = _parse_timestamp(
+                    resume["latest_commit_date"]
+                )
+            pending.append((repo_data, repo_since, resume["cursor"] if resume else None))
+        
+        while pending:
+            query, variables = build_history_query(
+                [
+                    (repo_data["owner"]["login"], repo_data["name"], repo_since, cursor)
+                    for repo_data, repo_since, cursor in pending
+                ],
+                author_id,
+            )
+            payload = await self.graphql(query, variables)
             
-            # Get commits for this repo
-            commits = await self.get_commits_for_repo(owner, repo, username, since)
+            if payload is None:
+                fallback_plans.extend(
+                    (repo_data, repo_since) for repo_data, repo_since, _ in pending
+                )
+                break
             
-            for commit_data in commits:
-                commit_sha = commit_data["sha"]
-                
-                # Check if we already have this contribution
-                existing = db.query(Contribution).filter(
-                    Contribution.commit_sha == commit_sha
-                ).first()
-                
-                if existing:
+            data = payload.get("data") or {}
+            rows = []
+            next_pending = []
+            finished = []
+            for i, (repo_data, repo_since, cursor) in enumerate(pending):
+                history = extract_history(data.get(f"r{i}"))
+                if history is None:
+                    fallback_plans.append((repo_data, repo_since))
                     continue
                 
-                # Get detailed commit information
-                commit_details = await self.get_commit_details(owner, repo, commit_sha)
-                
-                if not commit_details:
-                    continue
+                repo_rows = [
+                    history_node_to_row(run.user_id, repo_data, node)
+                    for node in history["nodes"]
+                ]
+                rows.extend(repo_rows)
+                run.progress.add_commits(len(repo_rows), 0)
                 
-                # Parse commit data
-                commit_date = datetime.fromisoformat(
-                    commit_data["commit"]["author"]["date"].replace("Z", "+00:00")
+                repo_name = repo_data["full_name"]
+                latest_commit_dates[repo_name] = _latest(
+                    [latest_commit_dates.get(repo_name)]
+                    + [row["commit_date"] for row in repo_rows]
                 )
                 
-                stats = commit_details.get("stats", {})
-                
-                contribution = Contribution(
-                    user_id=user.id,
-                    repo_name=repo_name,
-                    repo_url=repo_url,
-                    commit_sha=commit_sha,
-                    commit_message=commit_data["commit"]["message"],
-                    commit_url=commit_data["html_url"],
-                    commit_date=commit_date,
-                    additions=stats.get("additions", 0),
-                    deletions=stats.get("deletions", 0),
-                    files_changed=len(commit_details.get("files", []))
+                page_info = history["pageInfo"]
+                if page_info["hasNextPage"]:
+                    next_pending.append((repo_data, repo_since, page_info["endCursor"]))
+                else:
+                    finished.append(repo_data)
+            
+            inserted = await run.writer.call(insert_contributions, rows)
+            contributions_count += inserted
+            run.progress.add_commits(0, inserted)
+            for repo_data in finished:
+                await self._record_repo_synced(
+                    run, repo_data, latest_commit_dates.get(repo_data["full_name"])
                 )
+                run.progress.repo_done()
+            
+            # Commit the round, then checkpoint the repos with pages left
+            await run.writer.call(_commit)
+            for repo_data in finished:
+                await self.checkpoints.discard(run.user_id, run.since, repo_data["full_name"])
+            for repo_data, _, cursor in next_pending:
+                await self._save_resume_point(
+                    run, repo_data, "graphql", cursor,
+                    latest_commit_dates.get(repo_data["full_name"])
+                )
+            pending = next_pending
+        
+        return contributions_count, fallback_plans
+    
+    async def _sync_repo(
+        self,
+        run: "SyncRun",
+        repo_data: Dict[str, Any],
+        repo_since: datetime
+    ) -> int:
+        """Stream one repository's commits page by page into the writer."""
+        owner = repo_data["owner"]["login"]
+        repo = repo_data["name"]
+        
+        contributions_count = 0
+        complete = True
+        latest_commit_date = None
+        start_url = None
+        resume = self._resume_point(run, repo_data, "rest")
+        if resume:
+            start_url = resume["cursor"]
+            complete = resume["complete"]
+            latest_commit_date = _parse_timestamp(resume["latest_commit_date"])
+        
+        try:
+            async for page in self.iter_commits_for_repo(
+                owner, repo, run.username, repo_since, start_url
+            ):
+                commits = page.payload
+                if commits:
+                    page_count, page_complete = await self._sync_commit_page(
+                        run, repo_data, commits
+                    )
+                    contributions_count += page_count
+                    complete = complete and page_complete
+                    latest_commit_date = _latest(
+                        [latest_commit_date]
+                        + [_parse_timestamp(c["commit"]["author"]["date"]) for c in commits]
+                    )
                 
-                db.add(contribution)
-                contributions_count += 1
+                if page.next_url:
+                    # Commit the page, then checkpoint the one after it
+                    await run.writer.call(_commit)
+                    await self._save_resume_point(
+                        run, repo_data, "rest", page.next_url, latest_commit_date, complete
+                    )
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to get commits for {owner}/{repo}: {e}")
+            run.incomplete = True
+            return contributions_count
+        finally:
+            run.progress.repo_done()
         
-        db.commit()
-        logger.info(f"Synced {contributions_count} contributions for {username}")
+        # Only advance the watermark if no commit was skipped on an error
+        if complete:
+            await self._record_repo_synced(run, repo_data, latest_commit_date)
+        else:
+            run.incomplete = True
+        await run.writer.call(_commit)
+        await self.checkpoints.discard(run.user_id, run.since, repo_data["full_name"])
         return contributions_count
+    
+    @staticmethod
+    def _resume_point(
+        run: "SyncRun",
+        repo_data: Dict[str, Any],
+        kind: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the checkpoint to resume a repo from, if it is still valid.
+        
+        A checkpoint only applies to the paging scheme that wrote it, and
+        only while the repo has not been pushed to since: new commits would
+        shift the pages that the cursor assumes are done.
+        """
+        resume = run.resume_points.get(repo_data["full_name"])
+        if (
+            resume is None
+            or resume["kind"] != kind
+            or resume["pushed_at"] != repo_data.get("pushed_at")
+        ):
+            return None
+        return resume
+    
+    async def _save_resume_point(
+        self,
+        run: "SyncRun",
+        repo_data: Dict[str, Any],
+        kind: str,
+        cursor: str,
+        latest_commit_date: Optional[datetime],
+        complete: bool = True
+    ):
+        await self.checkpoints.save(
+            run.user_id,
+            run.since,
+            repo_data["full_name"],
+            kind,
+            cursor,
+            repo_data.get("pushed_at"),
+            latest_commit_date,
+            complete,
+        )
+    
+    async def _sync_commit_page(
+        self,
+        run: "SyncRun",
+        repo_data: Dict[str, Any],
+        commits: List[Dict[str, Any]]
+    ) -> Tuple[int, bool]:
+        """
+        Store one page of commits: one dedup lookup and one bulk insert.
+        
+        Returns the number of rows stored and whether every new commit on the
+        page could be stored.
+        """
+        owner = repo_data["owner"]["login"]
+        repo = repo_data["name"]
+        
+        run.progress.add_commits(len(commits), 0)
+        
+        # Skip commits we already have before spending API calls on details
+        known_shas = await run.writer.call(
+            get_known_shas, [commit_data["sha"] for commit_data in commits]
+        )
+        new_commits = [
+            commit_data for commit_data in commits
+            if commit_data["sha"] not in known_shas
+        ]
+        if not new_commits:
+            return 0, True
+        # End the transaction the lookup began before waiting on GitHub, so
+        # the connection goes back to the pool while the details come in
+        await run.writer.call(_commit)
+        
+        # Fan out detail lookups; request slots bound how many are in flight
+        all_details = await asyncio.gather(*(
+            self.get_commit_details(owner, repo, commit_data["sha"])
+            for commit_data in new_commits
+        ))
+        
+        rows = [
+            self._build_contribution_row(run.user_id, repo_data, commit_data, commit_details)
+            for commit_data, commit_details in zip(new_commits, all_details)
+            if commit_details
+        ]
+        inserted = await run.writer.call(insert_contributions, rows)
+        run.progress.add_commits(0, inserted)
+        return inserted, len(rows) == len(new_commits)
+    
+    async def _record_repo_synced(
+        self,
+        run: "SyncRun",
+        repo_data: Dict[str, Any],
+        latest_commit_date: Optional[datetime]
+    ):
+        await run.writer.call(
+            record_repo_synced,
+            run.user_id,
+            repo_data["full_name"],
+            _parse_timestamp(repo_data.get("pushed_at")),
+            run.since,
+            latest_commit_date,
+            run.started_at,
+        )
+    
+    @staticmethod
+    def _build_contribution_row(
+        user_id: int,
+        repo_data: Dict[str, Any],
+        commit_data: Dict[str, Any],
+        commit_details: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build a contributions row from a commit listing entry and its details."""
+        commit_date = _parse_timestamp(commit_data["commit"]["author"]["date"])
+        
+        stats = commit_details.get("stats", {})
+        
+        return {
+            "user_id": user_id,
+            "repo_name": repo_data["full_name"],
+            "repo_url": repo_data["html_url"],
+            "commit_sha": commit_data["sha"],
+            "commit_message": commit_data["commit"]["message"],
+            "commit_url": commit_data["html_url"],
+            "commit_date": commit_date,
+            "additions": stats.get("additions", 0),
+            "deletions": stats.get("deletions", 0),
+            "files_changed": len(commit_details.get("files", [])),
+        }
+
+
+class ListPage(NamedTuple):
+    payload: Any
+    next_url: Optional[str]
+    headers: httpx.Headers
+
+
+@dataclass
+class SyncRun:
+    """State shared by the tasks of one sync_user_contributions call."""
+    
+    writer: "SessionWriter"
+    user_id: int
+    username: str
+    since: datetime
+    started_at: datetime
+    progress: SyncProgress
+    # Checkpointed cursors of an interrupted run, keyed by repo full name
+    resume_points: Dict[str, Dict[str, Any]]
+    author_lookup: Optional[asyncio.Future] = None
+    # Set when a repo listing, commit listing or commit detail call failed
+    incomplete: bool = False
+
+
+class SessionWriter:
+    """
+    Single consumer that owns a database Session for the duration of a sync.
+    
+    Concurrent fetch tasks submit callables instead of using the Session
+    directly; the writer runs them one at a time, in submission order. Each
+    call runs in a worker thread so blocking database I/O never stalls the
+    event loop that other syncs share.
+    """
+    
+    def __init__(self, db: Session):
+        self.db = db
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._consumer: Optional[asyncio.Task] = None
+    
+    async def __aenter__(self) -> "SessionWriter":
+        self._consumer = asyncio.create_task(self._consume())
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self._queue.put(None)
+        await self._consumer
+    
+    async def call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(db, *args)`` on the writer and return its result."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((fn, args, future))
+        return await future
+    
+    async def _consume(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            
+            fn, args, future = item
+            if future.cancelled():
+                continue
+            try:
+                result = await asyncio.to_thread(fn, self.db, *args)
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
+
+
+def _commit(db: Session):
+    db.commit()
+
+
+def _read_and_release(db: Session, fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run the read ``fn(db, *args)``, then end its transaction.
+    
+    The connection goes back to the pool instead of being held while the
+    sync waits on GitHub. Loaded objects are detached, not expired, so they
+    stay readable.
+    """
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+
+def _find_user(db: Session, username: str) -> Optional[User]:
+    return db.query(User).filter(User.github_username == username).first()
+
+
+def _create_user(db: Session, username: str, user_info: Optional[Dict[str, Any]]) -> User:
+    """Create a user from their GitHub profile, or with minimal info without one."""
+    if user_info:
+        user = User(
+            github_username=user_info["login"],
+            email=user_info.get("email"),
+            full_name=user_info.get("name"),
+            avatar_url=user_info.get("avatar_url"),
+            github_id=user_info["id"]
+        )
+    else:
+        user = User(github_username=username)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def _find_user_sync_state(
+    db: Session,
+    username: str
+) -> Tuple[Optional[User], Optional[UserSyncState]]:
+    user = _find_user(db, username)
+    return user, db.get(UserSyncState, user.id) if user else None
+
+
+def _finish_user_sync(db: Session, user_id: int, synced_at: datetime, complete: bool = True):
+    """
+    Schedule the user's next sync and commit, recording the sync as the
+    user's last one only if it was ``complete``.
+    """
+    if complete:
+        record_user_synced(db, user_id, synced_at)
+    schedule_next_sync(db, user_id, synced_at)
+    db.commit()
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO 8601 timestamp as returned by the GitHub API."""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+async def _single_page(items: List[Dict[str, Any]]) -> AsyncIterator[List[Dict[str, Any]]]:
+    yield items
+
+
+def _start_of_day(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _latest(values) -> Optional[datetime]:
+    return max((value for value in values if value is not None), default=None)
 
 
 github_sync_service = GitHubSyncService()
\ No newline at end of file
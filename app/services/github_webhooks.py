@@ -0,0 +1,98 @@
+import hashlib
+import hmac
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import parse_qs
+
+SIGNATURE_PREFIX = "sha256="
+# The two content types a GitHub webhook can be configured to deliver
+JSON_CONTENT_TYPE = "application/json"
+FORM_CONTENT_TYPE = "application/x-www-form-urlencoded"
+
+
+def sign_payload(secret: str, body: bytes) -> str:
+    """Return the ``X-Hub-Signature-256`` header value GitHub sends for ``body``."""
+    digest = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return SIGNATURE_PREFIX + digest
+
+
+def verify_signature(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    """Check a delivery's ``X-Hub-Signature-256`` header in constant time."""
+    if not secret or not signature:
+        return False
+    return hmac.compare_digest(sign_payload(secret, body), signature)
+
+
+def parse_payload(body: bytes, content_type: str) -> Dict[str, Any]:
+    """
+    Decode a delivery body of either webhook content type.
+    
+    Form deliveries carry the JSON document in their ``payload`` field.
+    Raises ValueError if the body cannot be decoded.
+    """
+    if content_type == FORM_CONTENT_TYPE:
+        fields = parse_qs(body.decode("utf-8"))
+        if "payload" not in fields:
+            raise ValueError("Form delivery has no payload field")
+        return json.loads(fields["payload"][0])
+    return json.loads(body)
+
+
+def is_default_branch_push(payload: Dict[str, Any]) -> bool:
+    """
+    Whether a push event added commits to the repo's default branch.
+    
+    Polling syncs only count default-branch history, so pushes to other
+    branches are left for when they are merged.
+    """
+    repository = payload.get("repository") or {}
+    default_branch = repository.get("default_branch")
+    return (
+        not payload.get("deleted")
+        and default_branch is not None
+        and payload.get("ref") == f"refs/heads/{default_branch}"
+    )
+
+
+def push_author_logins(payload: Dict[str, Any]) -> Set[str]:
+    """Return the GitHub logins of the commit authors in a push event."""
+    return {
+        commit["author"]["username"]
+        for commit in payload.get("commits") or []
+        if (commit.get("author") or {}).get("username")
+    }
+
+
+def push_to_rows(payload: Dict[str, Any], user_ids: Dict[str, int]) -> List[Dict[str, Any]]:
+    """
+    Build contributions rows for the commits of a push event.
+    
+    Only commits authored by a tracked user (``user_ids`` maps login to user
+    id) are kept. Push payloads carry no line stats, so additions and
+    deletions start at zero and files_changed counts the listed paths until
+    the commit is enriched from the commits API.
+    """
+    repository = payload["repository"]
+    rows = []
+    for commit in payload.get("commits") or []:
+        user_id = user_ids.get((commit.get("author") or {}).get("username"))
+        if user_id is None:
+            continue
+        rows.append({
+            "user_id": user_id,
+            "repo_name": repository["full_name"],
+            "repo_url": repository["html_url"],
+            "commit_sha": commit["id"],
+            "commit_message": commit["message"],
+            "commit_url": commit["url"],
+            "commit_date": datetime.fromisoformat(commit["timestamp"].replace("Z", "+00:00")),
+            "additions": 0,
+            "deletions": 0,
+            "files_changed": len(
+                set(commit.get("added", []))
+                | set(commit.get("removed", []))
+                | set(commit.get("modified", []))
+            ),
+        })
+    return rows
@@ -0,0 +1,89 @@
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+import redis
+import redis.asyncio
+from ..core.config import settings
+from ..core.redis import async_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class SyncCheckpointStore:
+    """
+    Redis record of how far an interrupted sync got within each repo.
+    
+    Checkpoints are keyed by user and sync window rather than by task, so a
+    retried task, or a fresh one started the same day, resumes where the last
+    run stopped. Completed repos need no entry: their watermark is committed
+    with them and makes the next run skip them. Each entry holds the cursor
+    of the next page to fetch, saved only after everything before it was
+    committed, and is dropped when the repo is finished.
+    """
+    
+    KEY_PREFIX = "sync:checkpoint:github:"
+    
+    def __init__(
+        self,
+        client: redis.asyncio.Redis = async_redis_client,
+        ttl: int = settings.GITHUB_SYNC_CHECKPOINT_TTL
+    ):
+        self.client = client
+        self.ttl = ttl
+    
+    def key_for(self, user_id: int, since: datetime) -> str:
+        return f"{self.KEY_PREFIX}{user_id}:{since.date().isoformat()}"
+    
+    async def load(self, user_id: int, since: datetime) -> Dict[str, Dict[str, Any]]:
+        """Return the saved repo cursors of a sync window, keyed by repo full name."""
+        try:
+            entries = await self.client.hgetall(self.key_for(user_id, since))
+        except redis.RedisError as e:
+            logger.warning(f"Failed to load sync checkpoint for user {user_id}: {e}")
+            return {}
+        return {repo_name: json.loads(entry) for repo_name, entry in entries.items()}
+    
+    async def save(
+        self,
+        user_id: int,
+        since: datetime,
+        repo_name: str,
+        kind: str,
+        cursor: str,
+        pushed_at: Optional[str],
+        latest_commit_date: Optional[datetime],
+        complete: bool = True
+    ):
+        """
+        Record that a repo's pages up to ``cursor`` are committed.
+        
+        ``kind`` names the paging scheme the cursor belongs to and
+        ``pushed_at`` the repo state it is valid for; ``complete`` is False
+        if any commit before the cursor could not be stored.
+        """
+        entry = json.dumps({
+            "kind": kind,
+            "cursor": cursor,
+            "pushed_at": pushed_at,
+            "latest_commit_date": latest_commit_date.isoformat() if latest_commit_date else None,
+            "complete": complete,
+        })
+        key = self.key_for(user_id, since)
+        try:
+            pipe = self.client.pipeline()
+            pipe.hset(key, repo_name, entry)
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Failed to save sync checkpoint for {repo_name}: {e}")
+    
+    async def discard(self, user_id: int, since: datetime, repo_name: str):
+        """Drop a repo's cursor once the repo has been synced to the end."""
+        try:
+            await self.client.hdel(self.key_for(user_id, since), repo_name)
+        except redis.RedisError as e:
+            logger.warning(f"Failed to clear sync checkpoint for {repo_name}: {e}")
+
+
+sync_checkpoint_store = SyncCheckpointStore()
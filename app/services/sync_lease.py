@@ -0,0 +1,146 @@
+import logging
+from typing import Optional, Tuple
+import redis
+from ..core.config import settings
+from ..core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+# A lease is a hash of the owning task id, the widest days_back anyone has
+# asked for, and the days_back the owner's current run covers (0 while the
+# task is still queued).
+
+# Takes the lease for ARGV[1], or widens the existing one. Returns the
+# owning task id and 1 if the caller now owns the lease.
+ACQUIRE_SCRIPT = """
+local owner = redis.call('HGET', KEYS[1], 'task_id')
+if owner then
+    local days_back = tonumber(redis.call('HGET', KEYS[1], 'days_back')) or 0
+    if tonumber(ARGV[2]) > days_back then
+        redis.call('HSET', KEYS[1], 'days_back', ARGV[2])
+    end
+    return {owner, 0}
+end
+redis.call('HSET', KEYS[1], 'task_id', ARGV[1], 'days_back', ARGV[2], 'running', 0)
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return {ARGV[1], 1}
+"""
+
+# Marks the owner's run as started and returns the days_back to cover. A
+# missing lease is taken on the spot; one owned by another task is widened
+# instead and nothing is returned, as that task will cover this request.
+BEGIN_SCRIPT = """
+local owner = redis.call('HGET', KEYS[1], 'task_id')
+if owner and owner ~= ARGV[1] then
+    local days_back = tonumber(redis.call('HGET', KEYS[1], 'days_back')) or 0
+    if tonumber(ARGV[2]) > days_back then
+        redis.call('HSET', KEYS[1], 'days_back', ARGV[2])
+    end
+    return false
+end
+if not owner then
+    redis.call('HSET', KEYS[1], 'task_id', ARGV[1], 'days_back', ARGV[2])
+end
+local days_back = redis.call('HGET', KEYS[1], 'days_back')
+redis.call('HSET', KEYS[1], 'running', days_back)
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return days_back
+"""
+
+# Compare-and-delete. If the lease was widened while the owner ran, it is
+# kept and the wider days_back is returned so the owner runs again.
+RELEASE_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'task_id') ~= ARGV[1] then
+    return 0
+end
+local days_back = tonumber(redis.call('HGET', KEYS[1], 'days_back')) or 0
+local running = tonumber(redis.call('HGET', KEYS[1], 'running')) or 0
+if ARGV[2] == '0' and days_back > running then
+    redis.call('HSET', KEYS[1], 'running', days_back)
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+    return days_back
+end
+redis.call('DEL', KEYS[1])
+return 0
+"""
+
+
+class SyncLease:
+    """
+    Per-user Redis lease that coalesces GitHub sync requests.
+    
+    While a sync for a user is queued or running, further requests join it
+    instead of enqueueing a duplicate run; a request for a longer history
+    widens the pending job. All operations fail open, so an unavailable
+    Redis only costs the deduplication.
+    """
+    
+    KEY_PREFIX = "sync:lease:github:"
+    
+    def __init__(self, client: redis.Redis = redis_client, ttl: int = settings.GITHUB_SYNC_LEASE_TTL):
+        self.client = client
+        self.ttl = ttl
+        self._acquire = client.register_script(ACQUIRE_SCRIPT)
+        self._begin = client.register_script(BEGIN_SCRIPT)
+        self._release = client.register_script(RELEASE_SCRIPT)
+    
+    def key_for(self, username: str) -> str:
+        # GitHub logins are case-insensitive
+        return self.KEY_PREFIX + username.lower()
+    
+    def acquire(self, username: str, days_back: int, task_id: str) -> Tuple[str, bool]:
+        """
+        Claim the lease for a task that is about to be enqueued.
+        
+        Returns the task id that owns the lease and whether it is ``task_id``;
+        when it is not, the caller should reuse the owner instead of enqueueing.
+        """
+        try:
+            owner, created = self._acquire(
+                keys=[self.key_for(username)], args=[task_id, days_back, self.ttl]
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Sync lease unavailable, proceeding: {e}")
+            return task_id, True
+        return owner, bool(created)
+    
+    def begin(self, username: str, task_id: str, days_back: int) -> Optional[int]:
+        """
+        Start the owner's run, returning the (possibly widened) days_back.
+        
+        Returns None when another task holds the lease; that task has been
+        widened to cover ``days_back`` and this run should be skipped.
+        """
+        try:
+            result = self._begin(
+                keys=[self.key_for(username)], args=[task_id, days_back, self.ttl]
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Sync lease unavailable, proceeding: {e}")
+            return days_back
+        return int(result) if result else None
+    
+    def release(self, username: str, task_id: str) -> int:
+        """
+        Release the lease after a successful run.
+        
+        Returns the widened days_back if more history was requested while the
+        run was in progress (the lease is kept for the re-run), otherwise 0.
+        """
+        try:
+            return int(self._release(
+                keys=[self.key_for(username)], args=[task_id, 0, self.ttl]
+            ))
+        except redis.RedisError as e:
+            logger.warning(f"Failed to release sync lease for {username}: {e}")
+            return 0
+    
+    def abandon(self, username: str, task_id: str):
+        """Drop the lease after a failed run, regardless of any widening."""
+        try:
+            self._release(keys=[self.key_for(username)], args=[task_id, 1, self.ttl])
+        except redis.RedisError as e:
+            logger.warning(f"Failed to release sync lease for {username}: {e}")
+
+
+github_sync_lease = SyncLease()
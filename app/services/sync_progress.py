@@ -0,0 +1,145 @@
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Optional
+import httpx
+import redis
+from ..core.config import settings
+from ..core.redis import async_redis_client, redis_client
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "sync:progress:"
+# Stages after which no further updates are published for a task
+TERMINAL_STAGES = ("completed", "failed", "skipped")
+# Updates are coalesced so a busy sync publishes a few times a second at most
+MIN_PUBLISH_INTERVAL = 0.5
+
+
+def progress_channel(task_id: str) -> str:
+    return CHANNEL_PREFIX + task_id
+
+
+def progress_snapshot_key(task_id: str) -> str:
+    return CHANNEL_PREFIX + task_id + ":latest"
+
+
+def get_progress_snapshot(task_id: str) -> Optional[Dict[str, Any]]:
+    """Return the latest published progress of a task, if any."""
+    try:
+        snapshot = redis_client.get(progress_snapshot_key(task_id))
+    except redis.RedisError as e:
+        logger.warning(f"Failed to read sync progress for {task_id}: {e}")
+        return None
+    return json.loads(snapshot) if snapshot else None
+
+
+@dataclass
+class SyncProgress:
+    """
+    Live counters for one sync, published to Redis as they change.
+    
+    Each update is sent on the task's pub/sub channel for streaming clients
+    and stored as the latest snapshot for clients that join late. Without a
+    task id the counters are only kept locally.
+    
+    Updates made on an event loop are sent in the background through the
+    async client, in order; ``drain`` waits until they have been sent.
+    """
+    
+    task_id: Optional[str]
+    username: str
+    stage: str = "queued"
+    repos_total: int = 0
+    repos_done: int = 0
+    commits_fetched: int = 0
+    contributions_synced: int = 0
+    api_calls: int = 0
+    rate_limit_remaining: Optional[int] = None
+    # Publishing state, left out of snapshots
+    published_at: float = field(default=0.0, repr=False)
+    _pending: Optional[str] = field(default=None, repr=False)
+    _sender: Optional[asyncio.Task] = field(default=None, repr=False)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.repr}
+    
+    def record_api_call(self, response: httpx.Response):
+        self.api_calls += 1
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        if remaining is not None:
+            self.rate_limit_remaining = int(remaining)
+        self.publish()
+    
+    def add_repos(self, total: int, skipped: int = 0):
+        self.repos_total += total
+        self.repos_done += skipped
+        self.publish()
+    
+    def repo_done(self):
+        self.repos_done += 1
+        self.publish()
+    
+    def add_commits(self, fetched: int, stored: int):
+        self.commits_fetched += fetched
+        self.contributions_synced += stored
+        self.publish()
+    
+    def set_stage(self, stage: str):
+        self.stage = stage
+        self.publish(force=True)
+    
+    def publish(self, force: bool = False):
+        if self.task_id is None:
+            return
+        now = time.monotonic()
+        if not force and now - self.published_at < MIN_PUBLISH_INTERVAL:
+            return
+        self.published_at = now
+        
+        message = json.dumps(self.snapshot())
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is None:
+            self._send(message)
+            return
+        
+        # One sender per tracker keeps updates in order; a busy one just
+        # picks up the newest message when it is done with the last
+        self._pending = message
+        if self._sender is None or self._sender.done():
+            self._sender = loop.create_task(self._send_pending())
+    
+    async def drain(self):
+        """Wait until every update published from the event loop has been sent."""
+        if self._sender is not None:
+            await self._sender
+    
+    async def _send_pending(self):
+        while self._pending is not None:
+            message, self._pending = self._pending, None
+            try:
+                pipe = async_redis_client.pipeline(transaction=False)
+                self._queue_message(pipe, message)
+                await pipe.execute()
+            except redis.RedisError as e:
+                logger.warning(f"Failed to publish sync progress for {self.task_id}: {e}")
+    
+    def _send(self, message: str):
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            self._queue_message(pipe, message)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Failed to publish sync progress for {self.task_id}: {e}")
+    
+    def _queue_message(self, pipe, message: str):
+        pipe.set(
+            progress_snapshot_key(self.task_id), message,
+            ex=settings.GITHUB_SYNC_PROGRESS_TTL
+        )
+        pipe.publish(progress_channel(self.task_id), message)
@@ -0,0 +1,80 @@
+import random
+from datetime import datetime, timedelta
+from typing import Iterator
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models import Contribution, User, UserSyncState
+
+
+def sync_interval(commits_per_day: float) -> timedelta:
+    """
+    Time until a user with the given commit rate is due again.
+    
+    The interval aims at a fixed number of new commits per sync, so busy
+    users are synced often and dormant ones rarely. Jitter is applied after
+    the bounds, so users pinned to a bound still fall due at spread-out times.
+    """
+    if commits_per_day > 0:
+        seconds = settings.GITHUB_SCHEDULE_COMMITS_PER_SYNC / commits_per_day * 86400
+    else:
+        seconds = settings.GITHUB_SCHEDULE_MAX_INTERVAL
+    seconds = min(
+        max(seconds, settings.GITHUB_SCHEDULE_MIN_INTERVAL),
+        settings.GITHUB_SCHEDULE_MAX_INTERVAL,
+    )
+    jitter = settings.GITHUB_SCHEDULE_JITTER
+    return timedelta(seconds=seconds * random.uniform(1 - jitter, 1 + jitter))
+
+
+def schedule_next_sync(db: Session, user_id: int, synced_at: datetime) -> datetime:
+    """Set the user's next sync time from their recent commit rate."""
+    days = settings.GITHUB_SCHEDULE_ACTIVITY_DAYS
+    recent_commits = db.query(func.count(Contribution.id)).filter(
+        Contribution.user_id == user_id,
+        Contribution.commit_date >= synced_at - timedelta(days=days)
+    ).scalar()
+    
+    next_sync_at = synced_at + sync_interval(recent_commits / days)
+    stmt = insert(UserSyncState).values(user_id=user_id, next_sync_at=next_sync_at)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserSyncState.user_id],
+        set_={"next_sync_at": stmt.excluded.next_sync_at},
+    )
+    db.execute(stmt)
+    return next_sync_at
+
+
+def claim_due_users(db: Session, now: datetime, limit: int, chunk_size: int) -> Iterator[str]:
+    """
+    Yield the usernames of active users due for a sync, most overdue first.
+    
+    Due users are streamed ``chunk_size`` rows at a time. Each chunk is
+    claimed before it is yielded: its users have their next sync pushed out
+    by the claim period, so a later tick does not dispatch them again while
+    their sync is queued. A successful sync replaces the claim with a real
+    schedule. The caller commits the claims.
+    """
+    due = db.execute(
+        select(User.id, User.github_username)
+        .outerjoin(UserSyncState, UserSyncState.user_id == User.id)
+        .where(User.is_active == True)
+        .where(or_(UserSyncState.next_sync_at == None, UserSyncState.next_sync_at <= now))
+        .order_by(UserSyncState.next_sync_at.asc().nullsfirst())
+        .limit(limit)
+        .execution_options(yield_per=chunk_size)
+    )
+    
+    claimed_until = now + timedelta(seconds=settings.GITHUB_SCHEDULE_CLAIM_SECONDS)
+    for chunk in due.partitions():
+        stmt = insert(UserSyncState).values(
+            [{"user_id": user_id, "next_sync_at": claimed_until} for user_id, _ in chunk]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserSyncState.user_id],
+            set_={"next_sync_at": stmt.excluded.next_sync_at},
+        )
+        db.execute(stmt)
+        for _, username in chunk:
+            yield username
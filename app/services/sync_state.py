@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import Dict, Optional
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from ..models import UserSyncState, RepoSyncState
+
+
+def load_repo_states(db: Session, user_id: int) -> Dict[str, RepoSyncState]:
+    """Return the user's repo watermarks keyed by repo full name."""
+    states = db.query(RepoSyncState).filter(RepoSyncState.user_id == user_id).all()
+    return {state.repo_name: state for state in states}
+
+
+def record_repo_synced(
+    db: Session,
+    user_id: int,
+    repo_name: str,
+    pushed_at: Optional[datetime],
+    covered_since: datetime,
+    last_commit_date: Optional[datetime],
+    synced_at: datetime
+):
+    """
+    Upsert a repo watermark after every commit since ``covered_since`` was stored.
+    
+    Coverage only ever widens and the newest commit date only moves forward,
+    so overlapping syncs cannot move a watermark backwards.
+    """
+    stmt = insert(RepoSyncState).values(
+        user_id=user_id,
+        repo_name=repo_name,
+        pushed_at=pushed_at,
+        covered_since=covered_since,
+        last_commit_date=last_commit_date,
+        last_synced_at=synced_at,
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_repo_sync_states_user_repo",
+        set_={
+            "pushed_at": stmt.excluded.pushed_at,
+            "covered_since": func.least(RepoSyncState.covered_since, stmt.excluded.covered_since),
+            "last_commit_date": func.greatest(
+                RepoSyncState.last_commit_date, stmt.excluded.last_commit_date
+            ),
+            "last_synced_at": stmt.excluded.last_synced_at,
+        },
+    )
+    db.execute(stmt)
+
+
+def record_user_synced(db: Session, user_id: int, synced_at: datetime):
+    """Upsert the time of the user's last successful sync."""
+    stmt = insert(UserSyncState).values(user_id=user_id, last_synced_at=synced_at)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserSyncState.user_id],
+        set_={"last_synced_at": stmt.excluded.last_synced_at},
+    )
+    db.execute(stmt)
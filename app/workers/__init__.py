@@ -1,9 +1,15 @@
-from .tasks import celery_app, sync_github_data, sync_leetcode_data
+from .tasks import (
+    celery_app, rebuild_contribution_rollups, sync_github_batch, sync_github_data,
+    sync_github_recent, sync_leetcode_data
+)
 from .scheduler import setup_periodic_tasks
 
 __all__ = [
     "celery_app", 
     "sync_github_data", 
+    "sync_github_batch",
+    "sync_github_recent",
     "sync_leetcode_data", 
+    "rebuild_contribution_rollups",
     "setup_periodic_tasks"
 ]
\ No newline at end of file
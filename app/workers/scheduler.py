@@ -1,4 +1,5 @@
 from celery.schedules import crontab
+from ..core.config import settings
 from .tasks import celery_app
 
 
@@ -6,10 +7,10 @@ def setup_periodic_tasks():
     """Configure periodic tasks for the Celery app."""
     
     celery_app.conf.beat_schedule = {
-        # Sync GitHub data every day at 2 AM UTC
-        'sync-github-daily': {
-            'task': 'app.workers.tasks.sync_all_users_github',
-            'schedule': crontab(hour=2, minute=0),
+        # Sync GitHub data for users whose activity-based schedule is due
+        'sync-github-adaptive': {
+            'task': 'app.workers.tasks.dispatch_due_github_syncs',
+            'schedule': settings.GITHUB_SCHEDULE_TICK_SECONDS,
         },
         
         # Sync LeetCode data every day at 3 AM UTC
@@ -17,12 +18,6 @@ def setup_periodic_tasks():
             'task': 'app.workers.tasks.sync_all_users_leetcode',
             'schedule': crontab(hour=3, minute=0),
         },
-        
-        # Optional: More frequent sync during business hours
-        # 'sync-github-frequent': {
-        #     'task': 'app.workers.tasks.sync_all_users_github',
-        #     'schedule': crontab(minute=0, hour='9-17'),  # Every hour from 9 AM to 5 PM
-        # },
     }
     
     celery_app.conf.timezone = 'UTC'
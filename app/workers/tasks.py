@@ -1,13 +1,36 @@
-from celery import Celery
+import asyncio
+import os
+import threading
+import zlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Coroutine, Dict, List, Optional
+from celery import Celery, chord
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
 from sqlalchemy.orm import Session
 from ..core.config import settings
-from ..core.database import SessionLocal
+from ..core.database import SessionLocal, dispose_inherited_pools, pool_status
+from ..services.activity_rollup import rebuild_daily_activity, rebuild_user_stats
+from ..services.contribution_store import get_unenriched_shas, update_contribution_stats
 from ..services.github_sync import github_sync_service
 from ..services.leetcode_sync import leetcode_sync_service
+from ..services.sync_lease import github_sync_lease
+from ..services.sync_progress import SyncProgress
+from ..services.sync_schedule import claim_due_users
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Redis priorities run 0 (highest) to 9
+INTERACTIVE_PRIORITY = 0
+BULK_PRIORITY = 5
+
+# Users that fail inside a batch are retried in a batch of their own, on
+# the same terms as a single-user sync task
+BATCH_RETRY_COUNTDOWN = 60
+BATCH_MAX_RETRIES = 3
+
 celery_app = Celery(
     "devlog_radar",
     broker=settings.REDIS_URL,
@@ -22,37 +45,233 @@ celery_app.conf.update(
     timezone="UTC",
     enable_utc=True,
     result_expires=3600,
+    # Scheduled fan-out and everything else lands on the bulk queue; API
+    # handlers publish to the interactive queue explicitly
+    task_default_queue=settings.CELERY_BULK_QUEUE,
+    task_routes={
+        "app.workers.tasks.*": {"queue": settings.CELERY_BULK_QUEUE},
+    },
+    # A worker consuming both queues drains interactive first, and priority
+    # steps let urgent messages jump ahead within a queue
+    broker_transport_options={
+        "queue_order_strategy": "priority",
+        "priority_steps": list(range(10)),
+        # Redis redelivers a message not acked within this many seconds, and
+        # tasks with a countdown stay unacked until they run; it must outlast
+        # the longest countdown (a dispatch spreads batches over one tick)
+        # or staggered batches would run twice
+        "visibility_timeout": settings.GITHUB_SCHEDULE_TICK_SECONDS + 3600,
+    },
+    task_default_priority=BULK_PRIORITY,
+    # Hold only the task being run, so a long bulk batch never pins
+    # messages another worker could start now
+    worker_prefetch_multiplier=1,
 )
 
 
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_worker_loop_thread: Optional[threading.Thread] = None
+_worker_loop_pid: Optional[int] = None
+_worker_loop_lock = threading.Lock()
+
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return this worker process's long-lived event loop, starting it if needed.
+    
+    The loop runs in a daemon thread for the life of the process, so the
+    pooled GitHub client and caches bound to it survive across tasks. With
+    the threads pool, every task thread submits to this one loop and many
+    I/O-bound syncs run concurrently inside a single worker process.
+    """
+    global _worker_loop, _worker_loop_thread, _worker_loop_pid
+    
+    with _worker_loop_lock:
+        # A loop inherited across fork has no thread running it
+        if _worker_loop is None or _worker_loop_pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            # Session calls go through asyncio.to_thread; with one thread per
+            # pooled connection they never queue behind each other here
+            loop.set_default_executor(ThreadPoolExecutor(
+                max_workers=settings.DB_WORKER_POOL_SIZE + settings.DB_WORKER_MAX_OVERFLOW,
+                thread_name_prefix="worker-db",
+            ))
+            thread = threading.Thread(
+                target=loop.run_forever, name="worker-event-loop", daemon=True
+            )
+            thread.start()
+            _worker_loop, _worker_loop_thread, _worker_loop_pid = loop, thread, os.getpid()
+            logger.info("Started worker event loop")
+        return _worker_loop
+
+
+def run_async(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run a coroutine on the worker event loop and block until it finishes."""
+    return asyncio.run_coroutine_threadsafe(coro, get_worker_loop()).result()
+
+
+@worker_process_init.connect
+def start_worker_loop(**kwargs):
+    """Start the event loop as soon as a prefork child process boots."""
+    get_worker_loop()
+
+
+@worker_process_init.connect
+def reset_database_pools(**kwargs):
+    """Give a prefork child its own database connections, not the parent's."""
+    dispose_inherited_pools()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def log_database_pools(**kwargs):
+    """Log the process's pool usage so worker pools can be sized from it."""
+    logger.info(f"Database pool status: {pool_status()}")
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def stop_worker_loop(**kwargs):
+    """Close pooled GitHub connections and stop the worker event loop."""
+    global _worker_loop, _worker_loop_thread, _worker_loop_pid
+    
+    with _worker_loop_lock:
+        loop, thread = _worker_loop, _worker_loop_thread
+        if loop is None or _worker_loop_pid != os.getpid():
+            return
+        _worker_loop = _worker_loop_thread = _worker_loop_pid = None
+    
+    try:
+        asyncio.run_coroutine_threadsafe(github_sync_service.aclose(), loop).result(timeout=10)
+    except Exception as exc:
+        logger.warning(f"Failed to close GitHub client cleanly: {exc}")
+    
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=10)
+    loop.close()
+    logger.info("Stopped worker event loop")
+
+
 @celery_app.task(bind=True)
 def sync_github_data(self, username: str, days_back: int = 30):
     """Celery task to sync GitHub data for a user."""
+    # Live counters go to Redis pub/sub; the result backend is only told
+    # that the task started, clients read or stream the rest from there
+    progress = SyncProgress(self.request.id, username)
     try:
         logger.info(f"Starting GitHub sync task for user: {username}")
         
-        db: Session = SessionLocal()
-        try:
-            contributions_count = github_sync_service.sync_user_contributions(
-                db, username, days_back
-            )
+        self.update_state(state="PROGRESS", meta={"username": username})
+        contributions_count = run_async(
+            _sync_github_user(username, days_back, self.request.id, progress)
+        )
+        
+        logger.info(f"GitHub sync completed for {username}: {contributions_count} contributions")
+        return {
+            "success": True,
+            "username": username,
+            "contributions_synced": contributions_count,
+            "message": f"Successfully synced {contributions_count} contributions"
+        }
             
-            logger.info(f"GitHub sync completed for {username}: {contributions_count} contributions")
-            return {
-                "success": True,
-                "username": username,
-                "contributions_synced": contributions_count,
-                "message": f"Successfully synced {contributions_count} contributions"
-            }
+    except Exception as exc:
+        logger.error(f"GitHub sync failed for {username}: {exc}")
+        progress.set_stage("retrying" if self.request.retries < 3 else "failed")
+        self.retry(countdown=60, max_retries=3, exc=exc)
+
+
+@celery_app.task(bind=True)
+def sync_github_recent(self, username: str, days_back: int = 30):
+    """Celery task to sync only the repos a user pushed to since the last sync."""
+    progress = SyncProgress(self.request.id, username)
+    try:
+        logger.info(f"Starting fast-path GitHub sync task for user: {username}")
+        
+        # Under the user's sync lease, so it never overlaps a full sync
+        contributions_count = run_async(
+            _sync_github_user(username, days_back, self.request.id, progress, recent=True)
+        )
+        
+        logger.info(f"Fast-path GitHub sync completed for {username}: {contributions_count} contributions")
+        return {
+            "success": True,
+            "username": username,
+            "contributions_synced": contributions_count,
+            "message": f"Successfully synced {contributions_count} contributions"
+        }
             
+    except Exception as exc:
+        logger.error(f"Fast-path GitHub sync failed for {username}: {exc}")
+        progress.set_stage("retrying" if self.request.retries < 3 else "failed")
+        self.retry(countdown=60, max_retries=3, exc=exc)
+
+
+async def _fetch_commit_stats(repo_name: str, shas: List[str]) -> List[Dict[str, Any]]:
+    """Fetch line stats for commits of one repo; commits that fail are left out."""
+    owner, repo = repo_name.split("/", 1)
+    all_details = await asyncio.gather(*(
+        github_sync_service.get_commit_details(owner, repo, sha) for sha in shas
+    ))
+    return [
+        {
+            "commit_sha": sha,
+            "additions": details.get("stats", {}).get("additions", 0),
+            "deletions": details.get("stats", {}).get("deletions", 0),
+            "files_changed": len(details.get("files", [])),
+        }
+        for sha, details in zip(shas, all_details)
+        if details
+    ]
+
+
+@celery_app.task(bind=True)
+def enrich_contributions(self, repo_name: str, shas: List[str]):
+    """Celery task to fill in line stats for contributions stored from webhooks."""
+    try:
+        db: Session = SessionLocal()
+        try:
+            unenriched = get_unenriched_shas(db, shas)
+            pending = [sha for sha in shas if sha in unenriched]
+            stats = run_async(_fetch_commit_stats(repo_name, pending))
+            updated = update_contribution_stats(db, stats)
+            db.commit()
         finally:
             db.close()
-            
+        
+        if len(stats) < len(pending):
+            raise RuntimeError(f"{len(pending) - len(stats)} commits could not be fetched")
+        
+        logger.info(f"Enriched {updated} contributions in {repo_name}")
+        return {"success": True, "repo_name": repo_name, "contributions_enriched": updated}
+        
     except Exception as exc:
-        logger.error(f"GitHub sync failed for {username}: {exc}")
+        logger.error(f"Contribution enrichment failed for {repo_name}: {exc}")
         self.retry(countdown=60, max_retries=3, exc=exc)
 
 
+@celery_app.task
+def rebuild_contribution_rollups(user_id: Optional[int] = None):
+    """
+    Recompute daily_activity and user_stats from contributions.
+    
+    Repairs counters that drifted, e.g. after contributions were edited by
+    hand. Contribution writes wait until it commits, so prefer rebuilding
+    single users over everyone at once.
+    """
+    db: Session = SessionLocal()
+    try:
+        rebuild_daily_activity(db, user_id)
+        rebuild_user_stats(db, user_id)
+        db.commit()
+        logger.info(f"Rebuilt contribution rollups for {'user ' + str(user_id) if user_id else 'all users'}")
+        return {"success": True, "user_id": user_id}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
 @celery_app.task(bind=True)
 def sync_leetcode_data(self, username: str, days_back: int = 30):
     """Celery task to sync LeetCode data for a user."""
@@ -61,9 +280,9 @@ def sync_leetcode_data(self, username: str, days_back: int = 30):
         
         db: Session = SessionLocal()
         try:
-            submissions_count = leetcode_sync_service.sync_user_leetcode_data(
+            submissions_count = run_async(leetcode_sync_service.sync_user_leetcode_data(
                 db, username, days_back
-            )
+            ))
             
             logger.info(f"LeetCode sync completed for {username}: {submissions_count} submissions")
             return {
@@ -81,37 +300,238 @@ def sync_leetcode_data(self, username: str, days_back: int = 30):
         self.retry(countdown=60, max_retries=3, exc=exc)
 
 
+def user_sync_id(batch_id: str, username: str) -> str:
+    """
+    The id a user's sync inside a batch task goes by.
+    
+    It owns the user's lease and names their progress channel, so a request
+    that joins a batched sync gets an id describing that one user instead of
+    the whole batch.
+    """
+    return f"{batch_id}:{username.lower()}"
+
+
+async def _sync_github_user(
+    username: str,
+    days_back: int,
+    lease_owner: str,
+    progress: Optional[SyncProgress] = None,
+    recent: bool = False
+) -> int:
+    """
+    Sync one user under their sync lease, with a session of its own.
+    
+    Requests that arrive while the sync runs only widen the lease, so the
+    user is synced again with the widest days_back before it is released.
+    If another task already holds the lease, it covers this request instead.
+    With ``recent`` the first run takes the event-feed fast path; re-runs
+    for widened requests are always full syncs.
+    """
+    # Lease scripts and Session calls block, so they run in threads and the
+    # worker loop stays free for the other syncs it is driving
+    run_days_back = await asyncio.to_thread(
+        github_sync_lease.begin, username, lease_owner, days_back
+    )
+    if run_days_back is None:
+        logger.info(f"GitHub sync for {username} already in progress elsewhere; skipping")
+        if progress is not None:
+            progress.set_stage("skipped")
+            await progress.drain()
+        return 0
+    
+    db: Session = SessionLocal()
+    try:
+        total = 0
+        if recent:
+            total += await github_sync_service.sync_recent_activity(
+                db, username, run_days_back, progress
+            )
+            run_days_back = await asyncio.to_thread(
+                github_sync_lease.release, username, lease_owner
+            )
+        while run_days_back:
+            total += await github_sync_service.sync_user_contributions(
+                db, username, run_days_back, progress
+            )
+            run_days_back = await asyncio.to_thread(
+                github_sync_lease.release, username, lease_owner
+            )
+        if progress is not None:
+            progress.set_stage("completed")
+        return total
+    except Exception:
+        await asyncio.to_thread(github_sync_lease.abandon, username, lease_owner)
+        raise
+    finally:
+        await asyncio.to_thread(db.close)
+        # Later updates may come from the Celery thread; land these first
+        if progress is not None:
+            await progress.drain()
+
+
+async def _sync_github_users(
+    usernames: List[str],
+    days_back: int,
+    batch_id: str,
+    recent: bool = False
+) -> Dict[str, Any]:
+    """Sync a batch of users concurrently, isolating per-user failures."""
+    progresses = [
+        SyncProgress(user_sync_id(batch_id, username), username) for username in usernames
+    ]
+    results = await asyncio.gather(
+        *(
+            _sync_github_user(username, days_back, progress.task_id, progress, recent)
+            for username, progress in zip(usernames, progresses)
+        ),
+        return_exceptions=True,
+    )
+    
+    synced, failed = 0, []
+    for username, progress, result in zip(usernames, progresses, results):
+        if isinstance(result, Exception):
+            logger.error(f"GitHub sync failed for {username}: {result}")
+            progress.set_stage("failed")
+            await progress.drain()
+            failed.append(username)
+        else:
+            synced += result
+    
+    return {
+        "users": len(usernames),
+        "succeeded": len(usernames) - len(failed),
+        "failed": failed,
+        "contributions_synced": synced,
+    }
+
+
+@celery_app.task(bind=True)
+def sync_github_batch(
+    self,
+    usernames: List[str],
+    days_back: int = 30,
+    attempt: int = 0,
+    recent: bool = False
+):
+    """
+    Celery task to sync GitHub data for a chunk of users on the worker loop.
+    
+    With ``recent`` each user takes the event-feed fast path first. Users
+    whose sync failed are queued again as a new batch, up to
+    BATCH_MAX_RETRIES times, without re-running the users that succeeded.
+    """
+    logger.info(f"Starting GitHub batch sync for {len(usernames)} users")
+    stats = run_async(_sync_github_users(usernames, days_back, self.request.id, recent))
+    logger.info(
+        f"GitHub batch sync completed: {stats['succeeded']}/{stats['users']} users, "
+        f"{stats['contributions_synced']} contributions"
+    )
+    
+    stats["retried"] = []
+    if stats["failed"] and attempt < BATCH_MAX_RETRIES:
+        sync_github_batch.apply_async(
+            args=(stats["failed"], days_back),
+            kwargs={"attempt": attempt + 1, "recent": recent},
+            countdown=BATCH_RETRY_COUNTDOWN,
+        )
+        stats["retried"] = stats["failed"]
+        logger.info(f"Retrying GitHub sync for {len(stats['failed'])} failed users")
+    return stats
+
+
+@celery_app.task
+def summarize_github_fanout(results: List[Dict[str, Any]]):
+    """Chord callback aggregating the batch results of a scheduler tick."""
+    summary = {
+        "batches": len(results),
+        "users": sum(r["users"] for r in results),
+        "succeeded": sum(r["succeeded"] for r in results),
+        "failed": [username for r in results for username in r["failed"]],
+        "retried": [username for r in results for username in r.get("retried", [])],
+        "contributions_synced": sum(r["contributions_synced"] for r in results),
+    }
+    logger.info(
+        f"Scheduled GitHub sync finished: {summary['succeeded']}/{summary['users']} users "
+        f"in {summary['batches']} batches, {summary['contributions_synced']} contributions, "
+        f"{len(summary['failed'])} failures ({len(summary['retried'])} queued for retry)"
+    )
+    return summary
+
+
+def fanout_offset(username: str) -> int:
+    """
+    Deterministic start offset for a user within a scheduler tick.
+    
+    Offsets are rounded down to the start of a slot so users sharing a slot
+    can be synced together in one batch. The same user always lands in the
+    same slot, so their syncs start at the same point of whichever tick
+    dispatches them.
+    """
+    window = max(settings.GITHUB_SCHEDULE_TICK_SECONDS, 1)
+    slot = max(settings.GITHUB_SCHEDULE_SLOT_SECONDS, 1)
+    offset = zlib.crc32(username.encode("utf-8")) % window
+    return offset - offset % slot
+
+
 @celery_app.task
-def sync_all_users_github():
-    """Periodic task to sync GitHub data for all active users."""
+def dispatch_due_github_syncs():
+    """
+    Beat tick of the adaptive scheduler: sync only the users who are due.
+    
+    Due users are streamed from the database and claimed, grouped into
+    batches within their slot of the tick, and published as one chord whose
+    callback reports how the tick went. Each user goes through the
+    event-feed fast path, which falls back to a full sync when the feed
+    cannot cover it.
+    """
     try:
-        logger.info("Starting periodic GitHub sync for all users")
-        
         db: Session = SessionLocal()
         try:
-            from ..models import User
+            usernames = claim_due_users(
+                db,
+                datetime.now(timezone.utc),
+                settings.GITHUB_SCHEDULE_MAX_DISPATCH,
+                settings.GITHUB_SCHEDULE_QUERY_CHUNK,
+            )
             
-            users = db.query(User).filter(User.is_active == True).all()
-            
-            for user in users:
-                # Queue individual sync tasks
-                sync_github_data.delay(user.github_username)
-                
-            logger.info(f"Queued GitHub sync for {len(users)} users")
-            return {
-                "success": True,
-                "users_queued": len(users),
-                "message": f"Queued sync for {len(users)} users"
-            }
+            # Group users into batches within their slot, so each slot
+            # releases a bounded amount of work at its own countdown
+            batch_size = max(settings.GITHUB_SCHEDULE_BATCH_SIZE, 1)
+            pending: Dict[int, List[str]] = defaultdict(list)
+            batches = []
+            users_queued = 0
+            for username in usernames:
+                offset = fanout_offset(username)
+                pending[offset].append(username)
+                users_queued += 1
+                if len(pending[offset]) >= batch_size:
+                    batches.append(_scheduled_batch(pending.pop(offset), offset))
+            for offset, chunk in pending.items():
+                batches.append(_scheduled_batch(chunk, offset))
             
+            db.commit()
         finally:
             db.close()
-            
+        
+        if batches:
+            chord(batches)(summarize_github_fanout.s())
+            logger.info(f"Dispatched GitHub sync for {users_queued} due users in {len(batches)} batches")
+        return {
+            "success": True,
+            "users_queued": users_queued,
+            "batches_queued": len(batches),
+            "message": f"Queued sync for {users_queued} due users"
+        }
+        
     except Exception as exc:
-        logger.error(f"Periodic GitHub sync failed: {exc}")
+        logger.error(f"Adaptive GitHub sync dispatch failed: {exc}")
         raise
 
 
+def _scheduled_batch(usernames: List[str], offset: int):
+    return sync_github_batch.si(usernames, recent=True).set(countdown=offset)
+
+
 @celery_app.task
 def sync_all_users_leetcode():
     """Periodic task to sync LeetCode data for all active users."""
@@ -0,0 +1,67 @@
+"""Baseline: users and contributions
+
+Matches the schema previously created by ``create_tables()``. Databases
+created that way should be marked as migrated with
+``alembic stamp 0001`` before running ``alembic upgrade head``.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("github_username", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("full_name", sa.String(), nullable=True),
+        sa.Column("avatar_url", sa.String(), nullable=True),
+        sa.Column("github_id", sa.Integer(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("github_id"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_github_username", "users", ["github_username"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    
+    op.create_table(
+        "contributions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("repo_name", sa.String(), nullable=False),
+        sa.Column("repo_url", sa.String(), nullable=True),
+        sa.Column("commit_sha", sa.String(), nullable=False),
+        sa.Column("commit_message", sa.Text(), nullable=True),
+        sa.Column("commit_url", sa.String(), nullable=True),
+        sa.Column("commit_date", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("additions", sa.Integer(), nullable=True),
+        sa.Column("deletions", sa.Integer(), nullable=True),
+        sa.Column("files_changed", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("commit_sha"),
+    )
+    op.create_index("ix_contributions_id", "contributions", ["id"])
+
+
+def downgrade():
+    op.drop_index("ix_contributions_id", table_name="contributions")
+    op.drop_table("contributions")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_index("ix_users_github_username", table_name="users")
+    op.drop_index("ix_users_id", table_name="users")
+    op.drop_table("users")
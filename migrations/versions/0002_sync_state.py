@@ -0,0 +1,49 @@
+"""Sync state: per-user and per-repo watermarks and schedule
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "user_sync_states",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("last_synced_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("next_sync_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_index("ix_user_sync_states_next_sync_at", "user_sync_states", ["next_sync_at"])
+    
+    op.create_table(
+        "repo_sync_states",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("repo_name", sa.String(), nullable=False),
+        sa.Column("pushed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_commit_date", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("covered_since", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_synced_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "repo_name", name="uq_repo_sync_states_user_repo"),
+    )
+    op.create_index("ix_repo_sync_states_id", "repo_sync_states", ["id"])
+
+
+def downgrade():
+    op.drop_index("ix_repo_sync_states_id", table_name="repo_sync_states")
+    op.drop_table("repo_sync_states")
+    op.drop_index("ix_user_sync_states_next_sync_at", table_name="user_sync_states")
+    op.drop_table("user_sync_states")
@@ -0,0 +1,41 @@
+"""Composite (user_id, commit_date) index on contributions
+
+Summaries filter on one user and a commit_date range. The index serves
+that range directly, also covers lookups by user_id alone (joins, counts,
+deletes), and carries the columns the summaries read so they can be
+answered by an index-only scan.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+"""
+from alembic import op
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Build without blocking writes to a live contributions table
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_contributions_user_id_commit_date",
+            "contributions",
+            ["user_id", "commit_date"],
+            postgresql_include=["additions", "deletions", "repo_name"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_contributions_user_id_commit_date",
+            table_name="contributions",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,68 @@
+"""Daily activity rollup
+
+Per-user, per-day (UTC) contribution totals maintained at ingest time,
+plus the repos behind each day so distinct repos can be counted
+incrementally. Both are backfilled from contributions.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "daily_activity",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("commit_count", sa.Integer(), nullable=False),
+        sa.Column("additions", sa.Integer(), nullable=False),
+        sa.Column("deletions", sa.Integer(), nullable=False),
+        sa.Column("repos_touched", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "date"),
+    )
+    op.create_table(
+        "daily_activity_repos",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("repo_name", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "date", "repo_name"),
+    )
+    
+    op.execute("LOCK TABLE contributions IN SHARE MODE")
+    op.execute(
+        """
+        INSERT INTO daily_activity_repos (user_id, date, repo_name)
+        SELECT DISTINCT user_id, (commit_date AT TIME ZONE 'UTC')::date, repo_name
+        FROM contributions
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO daily_activity
+            (user_id, date, commit_count, additions, deletions, repos_touched)
+        SELECT user_id,
+               (commit_date AT TIME ZONE 'UTC')::date,
+               count(*),
+               coalesce(sum(additions), 0),
+               coalesce(sum(deletions), 0),
+               count(DISTINCT repo_name)
+        FROM contributions
+        GROUP BY 1, 2
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("daily_activity_repos")
+    op.drop_table("daily_activity")
@@ -0,0 +1,50 @@
+"""User contribution counters
+
+Per-user totals of contributions and line stats plus the latest commit
+date, maintained at ingest time so listing users does not aggregate
+contributions. Backfilled from contributions.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "user_stats",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("total_contributions", sa.Integer(), nullable=False),
+        sa.Column("total_additions", sa.BigInteger(), nullable=False),
+        sa.Column("total_deletions", sa.BigInteger(), nullable=False),
+        sa.Column("last_commit_date", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    
+    op.execute("LOCK TABLE contributions IN SHARE MODE")
+    op.execute(
+        """
+        INSERT INTO user_stats
+            (user_id, total_contributions, total_additions, total_deletions, last_commit_date)
+        SELECT user_id,
+               count(*),
+               coalesce(sum(additions), 0),
+               coalesce(sum(deletions), 0),
+               max(commit_date)
+        FROM contributions
+        GROUP BY user_id
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("user_stats")
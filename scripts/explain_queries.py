@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+import sys
+import argparse
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects import postgresql
+
+# Add the app directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import SessionLocal
+from app.models import User, Contribution
+from app.services.activity_rollup import daily_activity_query
+
+
+def summary_queries(db, user_id: int, days_back: int):
+    """The queries behind the summary endpoints, by name, with the index each should use."""
+    end_date = datetime.now(timezone.utc)
+    start_date = end_date - timedelta(days=days_back)
+    
+    return {
+        "activity summary": (
+            daily_activity_query(db, user_id, start_date.date(), end_date.date()),
+            "daily_activity_pkey",
+        ),
+        "contributions in range": (
+            db.query(
+                Contribution.commit_date,
+                Contribution.additions,
+                Contribution.deletions,
+                Contribution.repo_name
+            ).filter(
+                Contribution.user_id == user_id,
+                Contribution.commit_date >= start_date,
+                Contribution.commit_date <= end_date
+            ),
+            "ix_contributions_user_id_commit_date",
+        ),
+        "user contribution count": (
+            db.query(func.count(Contribution.id)).filter(Contribution.user_id == user_id),
+            "ix_contributions_user_id_commit_date",
+        ),
+    }
+
+
+def explain(db, query, analyze: bool) -> str:
+    sql = query.statement.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    options = "ANALYZE, BUFFERS" if analyze else "COSTS"
+    rows = db.execute(text(f"EXPLAIN ({options}) {sql}")).all()
+    return "\n".join(row[0] for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Show the PostgreSQL query plans of the contribution summary queries"
+    )
+    parser.add_argument("username", help="GitHub username whose summary queries to explain")
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=30,
+        help="Number of days the summary covers (default: 30)"
+    )
+    parser.add_argument(
+        "--analyze",
+        action="store_true",
+        help="Run the queries (EXPLAIN ANALYZE) to report actual timings and buffers"
+    )
+    
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.github_username == args.username).first()
+        if not user:
+            print(f"User not found: {args.username}")
+            sys.exit(1)
+        
+        uses_index = True
+        for name, (query, index_name) in summary_queries(db, user.id, args.days).items():
+            plan = explain(db, query, args.analyze)
+            print(f"== {name}")
+            print(plan)
+            print()
+            
+            if index_name not in plan:
+                uses_index = False
+                print(f"!! {name} does not use {index_name}")
+                print()
+        
+        if not uses_index:
+            # Small tables are legitimately scanned sequentially; run ANALYZE
+            # and retry against production-sized data before drawing conclusions
+            sys.exit(1)
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
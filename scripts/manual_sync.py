@@ -76,6 +76,14 @@ async def sync_all_platforms(username: str, days_back: int = 30):
     }
 
 
+async def run_with_shared_client(coro):
+    """Run a sync coroutine, then close the pooled GitHub client."""
+    try:
+        return await coro
+    finally:
+        await github_sync_service.aclose()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Manual sync script for Devlog Radar")
     parser.add_argument("username", help="GitHub username to sync")
@@ -101,15 +109,15 @@ def main():
     
     try:
         if args.platform == "github":
-            result = asyncio.run(sync_github(args.username, args.days))
+            result = asyncio.run(run_with_shared_client(sync_github(args.username, args.days)))
             print(f" GitHub sync completed: {result} contributions")
             
         elif args.platform == "leetcode":
-            result = asyncio.run(sync_leetcode(args.username, args.days))
+            result = asyncio.run(run_with_shared_client(sync_leetcode(args.username, args.days)))
             print(f" LeetCode sync completed: {result} submissions")
             
         elif args.platform == "all":
-            result = asyncio.run(sync_all_platforms(args.username, args.days))
+            result = asyncio.run(run_with_shared_client(sync_all_platforms(args.username, args.days)))
             print(f" Full sync completed:")
             print(f"   = GitHub: {result['github_contributions']} contributions")
             print(f"   > LeetCode: {result['leetcode_submissions']} submissions")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add the app directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import SessionLocal
+from app.models import User
+from app.services.activity_rollup import rebuild_daily_activity, rebuild_user_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Recompute the daily_activity rollup and user_stats counters from contributions"
+    )
+    parser.add_argument(
+        "username",
+        nargs="?",
+        help="Only rebuild this GitHub user's rollup (default: all users)"
+    )
+    
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        user_id = None
+        if args.username:
+            user = db.query(User).filter(User.github_username == args.username).first()
+            if not user:
+                print(f"User not found: {args.username}")
+                sys.exit(1)
+            user_id = user.id
+        
+        rebuild_daily_activity(db, user_id)
+        rebuild_user_stats(db, user_id)
+        db.commit()
+        print(f"Rebuilt daily activity and user stats for {args.username or 'all users'}")
+    except Exception as e:
+        db.rollback()
+        print(f"Rebuild failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
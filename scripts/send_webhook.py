@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+import sys
+import json
+import uuid
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+# Add the app directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services.github_webhooks import sign_payload
+
+
+def build_push_payload(username: str, repo_name: str, commits: int) -> dict:
+    """Build a minimal default-branch push event authored by ``username``."""
+    now = datetime.now(timezone.utc).isoformat()
+    return {
+        "ref": "refs/heads/main",
+        "deleted": False,
+        "repository": {
+            "full_name": repo_name,
+            "html_url": f"https://github.com/{repo_name}",
+            "default_branch": "main",
+        },
+        "commits": [
+            {
+                "id": uuid.uuid4().hex + uuid.uuid4().hex[:8],
+                "message": f"Webhook test commit {i + 1}",
+                "timestamp": now,
+                "url": f"https://github.com/{repo_name}/commit/{i}",
+                "author": {"username": username},
+                "added": [],
+                "removed": [],
+                "modified": ["README.md"],
+            }
+            for i in range(commits)
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Send a signed GitHub push webhook to a running Devlog Radar API"
+    )
+    parser.add_argument("username", help="GitHub username the commits are authored by")
+    parser.add_argument("--repo", default="devlog/webhook-test", help="Repository full name")
+    parser.add_argument("--commits", type=int, default=3, help="Number of commits (default: 3)")
+    parser.add_argument(
+        "--payload",
+        type=Path,
+        help="Send this JSON push payload instead of a generated one"
+    )
+    parser.add_argument(
+        "--url",
+        default="http://localhost:8000/webhooks/github",
+        help="Webhook endpoint (default: http://localhost:8000/webhooks/github)"
+    )
+    
+    args = parser.parse_args()
+    
+    if not settings.GITHUB_WEBHOOK_SECRET:
+        print("GITHUB_WEBHOOK_SECRET is not set")
+        sys.exit(1)
+    
+    if args.payload:
+        body = args.payload.read_bytes()
+    else:
+        body = json.dumps(build_push_payload(args.username, args.repo, args.commits)).encode()
+    
+    response = httpx.post(
+        args.url,
+        content=body,
+        headers={
+            "Content-Type": "application/json",
+            "X-GitHub-Event": "push",
+            "X-GitHub-Delivery": str(uuid.uuid4()),
+            "X-Hub-Signature-256": sign_payload(settings.GITHUB_WEBHOOK_SECRET, body),
+        },
+    )
+    print(f"{response.status_code}: {response.text}")
+    if response.is_error:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import json
+from pathlib import Path
+
+import pytest
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _signed(name: str):
+    signatures = json.loads((FIXTURES / "signatures.json").read_text())
+    return (FIXTURES / name).read_bytes(), signatures["signatures"][name]
+
+
+@pytest.fixture
+def webhook_secret() -> str:
+    """The secret the fixture deliveries were signed with."""
+    return json.loads((FIXTURES / "signatures.json").read_text())["secret"]
+
+
+@pytest.fixture
+def push_delivery():
+    """Raw body and X-Hub-Signature-256 of a default-branch push event."""
+    return _signed("push_event.json")
+
+
+@pytest.fixture
+def ping_delivery():
+    """Raw body and X-Hub-Signature-256 of a ping event."""
+    return _signed("ping_event.json")
+
+
+@pytest.fixture
+def push_payload(push_delivery):
+    return json.loads(push_delivery[0])
@@ -0,0 +1,293 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest import mock
+from urllib.parse import urlencode
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.api import routes_user, routes_webhooks
+from app.core.config import settings
+from app.core.database import get_db
+from app.main import app
+from app.services.github_webhooks import sign_payload
+
+PUSH_SHAS = [
+    "1a2b3c4d5e6f708192a3b4c5d6e7f80911a2b3c4",
+    "3c4d5e6f708192a3b4c5d6e7f80911a2b3c4d5e6",
+]
+
+
+async def _no_db():
+    # None of these requests get far enough to touch the database
+    yield None
+
+
+@pytest.fixture
+def client(monkeypatch, webhook_secret):
+    monkeypatch.setattr(settings, "GITHUB_WEBHOOK_SECRET", webhook_secret)
+    app.dependency_overrides[get_db] = _no_db
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_db, None)
+
+
+class FakeSession:
+    """Stands in for the AsyncSession of a push that reaches the database."""
+    
+    def __init__(self, users):
+        self.users = users
+        self.committed = False
+    
+    async def execute(self, statement):
+        return mock.Mock(all=lambda: self.users)
+    
+    async def run_sync(self, fn, *args):
+        return fn(self, *args)
+    
+    async def commit(self):
+        self.committed = True
+
+
+@pytest.fixture
+def push_db(monkeypatch):
+    """A tracked octocat, with inserts and enrichment stubbed out."""
+    session = FakeSession([SimpleNamespace(id=7, github_username="octocat")])
+    session.inserted = []
+    
+    def insert_contributions(db, rows):
+        session.inserted.extend(rows)
+        return len(rows)
+    
+    async def override():
+        yield session
+    
+    monkeypatch.setattr(routes_webhooks, "insert_contributions", insert_contributions)
+    monkeypatch.setattr(routes_webhooks, "enrich_contributions", mock.Mock())
+    app.dependency_overrides[get_db] = override
+    return session
+
+
+def _contribution(contribution_id, commit_date):
+    return SimpleNamespace(
+        id=contribution_id,
+        user_id=7,
+        repo_name="octocat/Hello-World",
+        repo_url=None,
+        commit_sha=f"{contribution_id:040x}",
+        commit_message=None,
+        commit_url=None,
+        commit_date=commit_date,
+        additions=0,
+        deletions=0,
+        files_changed=0,
+        created_at=commit_date,
+    )
+
+
+class ContributionsSession:
+    """
+    Serves a user's contributions the way the keyset query would.
+    
+    The cursor the route decodes is captured and applied in Python with the
+    same ``(commit_date, id) <`` comparison the SQL row-value uses.
+    """
+    
+    def __init__(self, rows):
+        self.rows = sorted(rows, key=lambda c: (c.commit_date, c.id), reverse=True)
+        self.position = None
+    
+    async def scalar(self, statement):
+        return 7
+    
+    async def scalars(self, statement):
+        rows = self.rows
+        if self.position is not None:
+            rows = [c for c in rows if (c.commit_date, c.id) < self.position]
+        return mock.Mock(all=lambda: rows[:statement._limit])
+
+
+@pytest.fixture
+def contributions_db(monkeypatch):
+    """Five commits, three of them sharing one commit_date."""
+    tied = datetime(2024, 3, 1, 12, tzinfo=timezone.utc)
+    session = ContributionsSession([
+        _contribution(1, tied - timedelta(days=1)),
+        _contribution(2, tied),
+        _contribution(3, tied),
+        _contribution(4, tied),
+        _contribution(5, tied + timedelta(days=1)),
+    ])
+    decode_cursor = routes_user._decode_cursor
+    
+    def capture_cursor(cursor):
+        session.position = decode_cursor(cursor)
+        return session.position
+    
+    async def override():
+        yield session
+    
+    monkeypatch.setattr(routes_user, "_decode_cursor", capture_cursor)
+    app.dependency_overrides[get_db] = override
+    return session
+
+
+def deliver(client, event, body, signature=None, content_type="application/json"):
+    headers = {"Content-Type": content_type, "X-GitHub-Event": event}
+    if signature is not None:
+        headers["X-Hub-Signature-256"] = signature
+    return client.post("/webhooks/github", content=body, headers=headers)
+
+
+class TestGitHubWebhook:
+    def test_not_configured(self, client, monkeypatch, push_delivery):
+        monkeypatch.setattr(settings, "GITHUB_WEBHOOK_SECRET", "")
+        body, signature = push_delivery
+        
+        response = deliver(client, "push", body, signature)
+        
+        assert response.status_code == 503
+    
+    def test_bad_signature(self, client, push_delivery):
+        body, _ = push_delivery
+        
+        response = deliver(client, "push", body, "sha256=" + "0" * 64)
+        
+        assert response.status_code == 401
+    
+    def test_missing_signature(self, client, push_delivery):
+        body, _ = push_delivery
+        
+        response = deliver(client, "push", body)
+        
+        assert response.status_code == 401
+    
+    def test_signature_for_other_body(self, client, push_delivery, ping_delivery):
+        body, _ = push_delivery
+        _, ping_signature = ping_delivery
+        
+        response = deliver(client, "push", body, ping_signature)
+        
+        assert response.status_code == 401
+    
+    def test_ping(self, client, ping_delivery):
+        body, signature = ping_delivery
+        
+        response = deliver(client, "ping", body, signature)
+        
+        assert response.status_code == 202
+        assert response.json() == {"status": "ok"}
+    
+    def test_other_event_ignored(self, client, ping_delivery):
+        body, signature = ping_delivery
+        
+        response = deliver(client, "issues", body, signature)
+        
+        assert response.status_code == 202
+        assert response.json() == {"status": "ignored", "event": "issues"}
+    
+    def test_push_to_other_branch_ignored(self, client, webhook_secret, push_delivery):
+        body, _ = push_delivery
+        body = body.replace(b'"refs/heads/main"', b'"refs/heads/feature"')
+        
+        response = deliver(client, "push", body, sign_payload(webhook_secret, body))
+        
+        assert response.status_code == 202
+        assert response.json() == {"status": "ignored", "event": "push"}
+    
+    def test_push_accepted(self, client, push_db, push_delivery):
+        body, signature = push_delivery
+        
+        response = deliver(client, "push", body, signature)
+        
+        assert response.status_code == 202
+        assert response.json() == {"status": "accepted", "contributions_inserted": 2}
+        assert [row["commit_sha"] for row in push_db.inserted] == PUSH_SHAS
+        assert {row["user_id"] for row in push_db.inserted} == {7}
+        assert push_db.committed
+        routes_webhooks.enrich_contributions.delay.assert_called_once_with(
+            "octocat/Hello-World", PUSH_SHAS
+        )
+    
+    def test_push_without_tracked_authors(self, client, push_db, push_delivery):
+        push_db.users = []
+        body, signature = push_delivery
+        
+        response = deliver(client, "push", body, signature)
+        
+        assert response.json() == {"status": "accepted", "contributions_inserted": 0}
+        routes_webhooks.enrich_contributions.delay.assert_not_called()
+    
+    def test_form_encoded_push(self, client, push_db, webhook_secret, push_delivery):
+        body = urlencode({"payload": push_delivery[0].decode()}).encode()
+        
+        response = deliver(
+            client, "push", body, sign_payload(webhook_secret, body),
+            content_type="application/x-www-form-urlencoded"
+        )
+        
+        assert response.status_code == 202
+        assert response.json()["contributions_inserted"] == 2
+    
+    def test_unsupported_content_type(self, client, push_delivery):
+        body, signature = push_delivery
+        
+        response = deliver(client, "push", body, signature, content_type="text/plain")
+        
+        assert response.status_code == 415
+    
+    def test_malformed_payload(self, client, webhook_secret):
+        body = b"payload=not-json"
+        
+        response = deliver(
+            client, "push", body, sign_payload(webhook_secret, body),
+            content_type="application/x-www-form-urlencoded"
+        )
+        
+        assert response.status_code == 400
+
+
+class TestContributionCursor:
+    def test_round_trip_keeps_timezone(self):
+        commit_date = datetime(2024, 3, 1, 12, 30, 15, 250000, tzinfo=timezone(timedelta(hours=2)))
+        
+        cursor = routes_user._encode_cursor(_contribution(42, commit_date))
+        
+        decoded_date, decoded_id = routes_user._decode_cursor(cursor)
+        assert (decoded_date, decoded_id) == (commit_date, 42)
+        assert decoded_date.utcoffset() == timedelta(hours=2)
+    
+    @pytest.mark.parametrize("cursor", [
+        "not base64!",
+        "bm8tc2VwYXJhdG9y",  # "no-separator"
+        "bm90LWEtZGF0ZXwx",  # "not-a-date|1"
+        "MjAyNC0wMy0wMXxvbmU=",  # "2024-03-01|one"
+        "_w==",  # not UTF-8
+    ])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(HTTPException) as excinfo:
+            routes_user._decode_cursor(cursor)
+        
+        assert excinfo.value.status_code == 400
+    
+    def test_pages_split_equal_commit_dates(self, client, contributions_db):
+        served, cursor = [], None
+        while True:
+            params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+            response = client.get("/users/7/contributions", params=params)
+            assert response.status_code == 200
+            page = response.json()
+            served.extend(c["id"] for c in page["contributions"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        
+        # Pages break inside the three commits dated alike, yet every row is
+        # served exactly once, newest first with id breaking ties
+        assert served == [5, 4, 3, 2, 1]
+    
+    def test_invalid_cursor_rejected_by_route(self, client, contributions_db):
+        response = client.get("/users/7/contributions", params={"cursor": "not base64!"})
+        
+        assert response.status_code == 400
+        assert response.json() == {"detail": "Invalid cursor"}
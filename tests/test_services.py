@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlencode
+
+import pytest
+
+from app.services.github_webhooks import (
+    FORM_CONTENT_TYPE, JSON_CONTENT_TYPE, is_default_branch_push, parse_payload,
+    push_author_logins, push_to_rows, sign_payload, verify_signature
+)
+
+
+class TestVerifySignature:
+    def test_accepts_github_signature(self, webhook_secret, push_delivery):
+        body, signature = push_delivery
+        assert verify_signature(webhook_secret, body, signature)
+    
+    def test_sign_payload_matches_github(self, webhook_secret, ping_delivery):
+        body, signature = ping_delivery
+        assert sign_payload(webhook_secret, body) == signature
+    
+    def test_rejects_wrong_secret(self, push_delivery):
+        body, signature = push_delivery
+        assert not verify_signature("not-the-secret", body, signature)
+    
+    def test_rejects_tampered_body(self, webhook_secret, push_delivery):
+        body, signature = push_delivery
+        assert not verify_signature(webhook_secret, body.replace(b"main", b"evil"), signature)
+    
+    def test_rejects_bad_signature(self, webhook_secret, push_delivery):
+        body, _ = push_delivery
+        assert not verify_signature(webhook_secret, body, "sha256=" + "0" * 64)
+        assert not verify_signature(webhook_secret, body, "garbage")
+    
+    def test_rejects_missing_signature(self, webhook_secret, push_delivery):
+        body, _ = push_delivery
+        assert not verify_signature(webhook_secret, body, None)
+        assert not verify_signature(webhook_secret, body, "")
+    
+    def test_rejects_without_secret(self, push_delivery):
+        body, signature = push_delivery
+        assert not verify_signature("", body, signature)
+
+
+class TestParsePayload:
+    def test_json(self, push_delivery, push_payload):
+        assert parse_payload(push_delivery[0], JSON_CONTENT_TYPE) == push_payload
+    
+    def test_form_encoded(self, push_delivery, push_payload):
+        body = urlencode({"payload": push_delivery[0].decode()}).encode()
+        assert parse_payload(body, FORM_CONTENT_TYPE) == push_payload
+    
+    def test_form_without_payload_field(self):
+        with pytest.raises(ValueError):
+            parse_payload(b"other=1", FORM_CONTENT_TYPE)
+    
+    def test_malformed_json(self):
+        with pytest.raises(ValueError):
+            parse_payload(b"{not json", JSON_CONTENT_TYPE)
+
+
+class TestIsDefaultBranchPush:
+    def test_default_branch(self, push_payload):
+        assert is_default_branch_push(push_payload)
+    
+    def test_other_branch(self, push_payload):
+        push_payload["ref"] = "refs/heads/feature"
+        assert not is_default_branch_push(push_payload)
+    
+    def test_tag_named_like_default_branch(self, push_payload):
+        push_payload["ref"] = "refs/tags/main"
+        assert not is_default_branch_push(push_payload)
+    
+    def test_branch_deletion(self, push_payload):
+        push_payload["deleted"] = True
+        assert not is_default_branch_push(push_payload)
+    
+    def test_unknown_default_branch(self, push_payload):
+        del push_payload["repository"]["default_branch"]
+        assert not is_default_branch_push(push_payload)
+
+
+class TestPushToRows:
+    def test_keeps_tracked_authors_only(self, push_payload):
+        rows = push_to_rows(push_payload, {"octocat": 7})
+        
+        assert [row["commit_sha"] for row in rows] == [
+            "1a2b3c4d5e6f708192a3b4c5d6e7f80911a2b3c4",
+            "3c4d5e6f708192a3b4c5d6e7f80911a2b3c4d5e6",
+        ]
+        assert {row["user_id"] for row in rows} == {7}
+        assert push_author_logins(push_payload) == {"octocat", "hubot"}
+    
+    def test_row_fields(self, push_payload):
+        row = push_to_rows(push_payload, {"octocat": 7})[0]
+        
+        assert row == {
+            "user_id": 7,
+            "repo_name": "octocat/Hello-World",
+            "repo_url": "https://github.com/octocat/Hello-World",
+            "commit_sha": "1a2b3c4d5e6f708192a3b4c5d6e7f80911a2b3c4",
+            "commit_message": "Add greeting",
+            "commit_url": (
+                "https://github.com/octocat/Hello-World/commit/"
+                "1a2b3c4d5e6f708192a3b4c5d6e7f80911a2b3c4"
+            ),
+            "commit_date": datetime(2024, 5, 1, 9, 15, tzinfo=timezone.utc),
+            "additions": 0,
+            "deletions": 0,
+            "files_changed": 2,
+        }
+    
+    def test_files_changed_counts_distinct_paths(self, push_payload):
+        rows = push_to_rows(push_payload, {"octocat": 7})
+        # hello.txt is both added and modified
+        assert rows[1]["files_changed"] == 3
+    
+    def test_keeps_timestamp_offset(self, push_payload):
+        row = push_to_rows(push_payload, {"hubot": 8})[0]
+        assert row["commit_date"] == datetime(
+            2024, 5, 1, 9, 20, tzinfo=timezone(timedelta(hours=2))
+        )
+        assert row["commit_date"].utcoffset() == timedelta(hours=2)
+    
+    def test_no_tracked_authors(self, push_payload):
+        assert push_to_rows(push_payload, {}) == []
+    
+    def test_no_commits(self, push_payload):
+        push_payload["commits"] = []
+        assert push_to_rows(push_payload, {"octocat": 7}) == []